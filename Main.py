@@ -1,7 +1,12 @@
+import argparse
+
 from modules.Black_sheep import BlackSheep
 
 def main():
-    BlackSheep()
+    parser = argparse.ArgumentParser(description='Black Sheep')
+    parser.add_argument('--startup-report', action='store_true', help='print the time to the first frame, by phase')
+    options = parser.parse_args()
+    BlackSheep(startup_report=options.startup_report)
 
 
 if "__main__" == __name__:
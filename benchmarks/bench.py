@@ -0,0 +1,262 @@
+"""
+Headless benchmarks of the hot paths of the game, run under the SDL dummy video driver.
+Usage: python -m benchmarks.bench [--output FILE] [--compare BASELINE] [--threshold FRACTION] [--repeat N] [--only NAME ...]
+The results are printed and, with --output, saved as JSON. With --compare, every benchmark is compared to a saved
+result, and the command exits with 1 if any of them got slower by more than the threshold.
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import pygame
+
+from modules.colores import colores
+from modules.Input import pointer
+from modules.orders import orders
+from modules.rules import legal_moves, make_position, apply_move
+from modules.symmetry import canonical_key
+from modules.solver import Solver
+
+
+SIZE = 600
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def setup():
+    pygame.init()
+    screen = pygame.display.set_mode((SIZE, SIZE))
+    return screen
+
+
+def make_board(screen, level):
+    from modules.Board import Board
+    order = orders[level - 1]
+    return Board(screen, (SIZE, SIZE), white_order=order[:-1], black_ball_loc=order[-1], color=colores['BLACK1'])
+
+
+class ScriptedMouse:
+    """
+    Replaces the mouse state pygame reports, so drags can be scripted without a display
+    """
+
+    def __init__(self):
+        self.pos = (0, 0)
+        self.pressed = (False, False, False)
+
+    def __enter__(self):
+        self.get_pos, self.get_pressed = pygame.mouse.get_pos, pygame.mouse.get_pressed
+        pygame.mouse.get_pos = lambda: self.pos
+        pygame.mouse.get_pressed = lambda num_buttons=3: self.pressed
+        return self
+
+    def __exit__(self, *args):
+        pygame.mouse.get_pos, pygame.mouse.get_pressed = self.get_pos, self.get_pressed
+
+
+# each benchmark gets the screen and returns the time of one run, in seconds
+
+@benchmark
+def board_construction(screen):
+    start = time.perf_counter()
+    for level in range(1, len(orders) + 1):
+        make_board(screen, level)
+    return (time.perf_counter() - start) / len(orders)
+
+
+@benchmark
+def get_permutations(screen):
+    board = make_board(screen, 1)
+    start = time.perf_counter()
+    board.get_permutations()
+    board.update_possibilities_per_hole()
+    return time.perf_counter() - start
+
+
+@benchmark
+def move_generation(screen):
+    positions = [make_position(order[:-1], order[-1]) for order in orders]
+    start = time.perf_counter()
+    for mask, black in positions:
+        for move in legal_moves(mask, black):
+            legal_moves(*apply_move(mask, black, move))
+    return (time.perf_counter() - start) / len(positions)
+
+
+@benchmark
+def no_possible_movement_left(screen):
+    board = make_board(screen, 47)
+    start = time.perf_counter()
+    for _ in range(1000):
+        board.no_possible_movement_left()
+    return (time.perf_counter() - start) / 1000
+
+
+@benchmark
+def canonicalization(screen):
+    positions = [make_position(order[:-1], order[-1]) for order in orders]
+    start = time.perf_counter()
+    for mask, black in positions:
+        canonical_key(mask, black)
+    return (time.perf_counter() - start) / len(positions)
+
+
+@benchmark
+def solve_all_levels(screen):
+    start = time.perf_counter()
+    Solver().solve_all()
+    return time.perf_counter() - start
+
+
+@benchmark
+def drag_and_release(screen):
+    board = make_board(screen, 1)
+    ball = next(ball for ball in board.get_balls() if ball.get_possible_destinations())
+    start_point = ball.rect.center
+    target = ball.get_possible_destinations()[0]
+    steps = 30
+    with ScriptedMouse() as mouse:
+        start = time.perf_counter()
+        mouse.pressed = (True, False, False)
+        mouse.pos = start_point
+        pointer.update()
+        board.activate(board.get_ball_at(pointer.get_pos()))
+        for step in range(1, steps + 1):
+            x = start_point[0] + (target.rect.centerx - start_point[0]) * step // steps
+            y = start_point[1] + (target.rect.centery - start_point[1]) * step // steps
+            mouse.pos = (x, y)
+            pointer.update()
+            ball.get_possible_destinations(highlight=True)
+            ball.follow_mouse()
+        mouse.pressed = (False, False, False)
+        pointer.update()
+        hole = ball.is_touching_hole()
+        if hole in ball.get_possible_destinations():
+            ball.release_at_hole(hole)
+        else:
+            ball.move_back()
+        return time.perf_counter() - start
+
+
+@benchmark
+def hole_lookup(screen):
+    board = make_board(screen, 1)
+    ball = next(iter(board.get_balls()))
+    rect = ball.rect.copy()
+    board.get_touched_hole(rect)  # builds the index
+    start = time.perf_counter()
+    for x in range(0, SIZE, 6):
+        rect.center = (x, x)
+        board.get_touched_hole(rect)
+    return (time.perf_counter() - start) / (SIZE // 6)
+
+
+@benchmark
+def textbox_creation(screen):
+    from modules.Backgrounds import Background
+    background = Background(screen, (SIZE, SIZE))
+    start = time.perf_counter()
+    background.add_text("Stuck?  Never mind,  Maybe  you'll  succeed  next  time.", 10, 555, size=SIZE // 10, box=True)
+    return time.perf_counter() - start
+
+
+@benchmark
+def full_frame_render(screen):
+    board = make_board(screen, 47)
+    button = board.add_button(x=SIZE // 3, y=10, width=10, height=35, text='Go back to menu.')
+    start = time.perf_counter()
+    board.show()
+    button.appear()
+    pygame.display.flip()
+    return time.perf_counter() - start
+
+
+@benchmark
+def dirty_frame_render(screen):
+    board = make_board(screen, 47)
+    board.show_dirty()
+    ball = next(iter(board.get_balls()))
+    board.mark_dirty(ball.rect)
+    start = time.perf_counter()
+    pygame.display.update(board.show_dirty())
+    return time.perf_counter() - start
+
+
+def run(names, repeat):
+    screen = setup()
+    results = {}
+    for name in names:
+        function = BENCHMARKS[name]
+        function(screen)  # warm up the caches
+        times = [function(screen) for _ in range(repeat)]
+        results[name] = {'median': statistics.median(times), 'min': min(times), 'runs': repeat}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    :return: the names of the benchmarks that are slower than in the baseline by more than threshold
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['median'] / baseline[name]['median'] if baseline[name]['median'] else 1.0
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f'{name:28} {baseline[name]["median"] * 1e6:12.2f} us -> {result["median"] * 1e6:12.2f} us  x{ratio:.2f}{flag}')
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench', description='Benchmark the game headless.')
+    parser.add_argument('--output', default=None, help='save the results to a JSON file')
+    parser.add_argument('--compare', default=None, help='a JSON file of results to compare to')
+    parser.add_argument('--threshold', type=float, default=0.2, help='the slowdown counted as a regression, 0.2 is 20%%')
+    parser.add_argument('--repeat', type=int, default=20, help='runs of every benchmark')
+    parser.add_argument('--only', nargs='*', choices=sorted(BENCHMARKS), default=None, help='benchmarks to run')
+    options = parser.parse_args(args)
+
+    results = run(options.only or list(BENCHMARKS), options.repeat)
+    for name, result in results.items():
+        print(f'{name:28} median {result["median"] * 1e6:12.2f} us   min {result["min"] * 1e6:12.2f} us')
+
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump({
+                'meta': {
+                    'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'python': platform.python_version(),
+                    'pygame': pygame.version.ver,
+                    'platform': platform.platform(),
+                    'video_driver': os.environ['SDL_VIDEODRIVER'],
+                },
+                'results': results,
+            }, file, indent=2)
+
+    if options.compare:
+        with open(options.compare) as file:
+            baseline = json.load(file)['results']
+        print()
+        if compare(results, baseline, options.threshold):
+            return 1
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import pygame
+import os
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+
+IMAGES_DIR = os.path.join(Path(__file__).parent.parent, 'assets', 'images')
+
+
+class AssetCache:
+    """
+    Keeps the loaded images in memory, keyed by (path, size, colorkey), so every image is read from disk once.
+    If max_bytes is set, the least recently used images are dropped when the cache holds more than that.
+    The cached surfaces are shared, so copy a surface before drawing on it.
+    It may be filled from a background thread, see preload.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()  # so an image asked for while it's being preloaded is loaded once
+
+    def get(self, path, size=None, colorkey=None):
+        """
+        :param path: the path of the image file
+        :param size: a (width, height) tuple to scale the image to, None to keep its original size
+        :param colorkey: a color to set as transparent
+        """
+        with self.lock:
+            return self.load(path, size, colorkey)
+
+    def load(self, path, size, colorkey):
+        key = (path, tuple(size) if size is not None else None, colorkey)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        if size is None and colorkey is None:
+            surface = pygame.image.load(path).convert()
+        else:
+            surface = self.get(path)
+            if size is not None:
+                surface = pygame.transform.scale(surface, key[1])
+            else:
+                surface = surface.copy()
+            if colorkey is not None:
+                surface.set_colorkey(colorkey)
+        self.add(key, surface)
+        return surface
+
+    def preload(self, images):
+        """
+        Loads the images into the cache, to run on a background thread while the first page is shown
+        :param images: an iterable of (path, size, colorkey) tuples, as get takes them
+        :return: the number of images loaded
+        """
+        count = 0
+        for path, size, colorkey in images:
+            self.get(path, size, colorkey)
+            count += 1
+        return count
+
+    def add(self, key, surface):
+        self.surfaces[key] = surface
+        self.bytes += self.size_of(surface)
+        self.evict()
+
+    def evict(self):
+        if self.max_bytes is None:
+            return
+        while self.bytes > self.max_bytes and len(self.surfaces) > 1:
+            _, surface = self.surfaces.popitem(last=False)
+            self.bytes -= self.size_of(surface)
+
+    def set_limit(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def clear(self):
+        with self.lock:
+            self.surfaces.clear()
+        self.bytes = 0
+
+    @staticmethod
+    def size_of(surface):
+        return surface.get_pitch() * surface.get_height()
+
+
+# the cache shared by all the pages of the game, bounded since every window size adds its own scaled images,
+# the images of one size take about 70 MB at a window of 2160 pixels
+assets = AssetCache(max_bytes=96 * 1024 * 1024)
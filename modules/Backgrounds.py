@@ -1,6 +1,7 @@
 import pygame
 
 from .colores import colores
+from .Assets import assets
 from .Buttons import Button, InputBox, HoverButton, TextBox
 
 
@@ -45,5 +46,5 @@ class BackgroundImage(Background):
 
     def __init__(self, screen: pygame.Surface, size: tuple, image, text=None):
         super().__init__(screen, size, text)
-        self.image = pygame.image.load(image).convert()
-        self.surface = pygame.transform.scale(self.image, size)
+        self.image = assets.get(image)
+        self.surface = assets.get(image, size).copy()  # a copy, since texts and boxes are drawn on it
@@ -1,30 +1,115 @@
 import pygame
 import sys
 import os
-from pathlib import Path
+import threading
+import time
 
 
-from .orders import orders
 from .colores import colores
+from .Assets import assets, IMAGES_DIR
 from .Backgrounds import BackgroundImage
-from .Board import Board
+from .Board import Board, get_sprite_images
+from .Scenes import SceneManager
+from .Scheduler import FrameScheduler
+from .retrograde import OutcomeTable
+from .hints import HintOracle
+from .levelpack import load_pack, DEFAULT_PACK_PATH
+from .Profiler import FrameProfiler, StartupReport
+from .Prefetch import LevelPrefetcher
+from .Input import pointer
+from .rules import make_order, find_move
+from .replay import SessionRecorder, read_session, LEVEL_START, LEVEL_END, WON, STUCK, LEFT, OUTCOMES
 
 
 FPS = 60
+MIN_SIZE = 300  # the smallest window the pages are laid out for
+SCENE_FPS = {'opening_page': 30, 'menu_page': 30, 'main_game': FPS, 'instructions_page': 30, 'replay_page': FPS}  # target frame rates
 
 
-IMAGES_DIR = os.path.join(Path(__file__).parent.parent, 'assets', 'images')
-
 class BlackSheep:
 
-    def __init__(self):
-        pygame.init()
+    def __init__(self, pack_path=DEFAULT_PACK_PATH, replay=None, record=True, startup_report=False):
+        """
+        :param replay: the path of a session log to show instead of playing
+        :param record: whether to log the levels played and the moves made to the sessions directory
+        :param startup_report: whether to print the time to the first frame, by phase
+        """
+        self.startup = StartupReport() if startup_report else None
+        # only the subsystems the game uses, the others (audio, joysticks...) take long to start and aren't needed
+        pygame.display.init()
+        pygame.font.init()
+        self.mark_startup('init')
         self.clock = pygame.time.Clock()
-        self.size = pygame.display.Info().current_h - 320
-        self.size = 600 
+        self.scheduler = FrameScheduler(self.clock, FPS)  # blocks on input while nothing moves
+        self.outcomes = OutcomeTable.load()  # tells if a position can still be won, None if the file is missing
+        self.hints = HintOracle(self.outcomes)
+        self.show_hints = False  # toggled by pressing H during a game
+        self.levels = load_pack(pack_path)  # the levels of the game, numbered from 1
+        self.prefetcher = LevelPrefetcher(self.levels, self.hints)  # builds the board of the level to be played next
+        self.profiler = FrameProfiler()  # F3 toggles it and its overlay, F4 dumps its frames
+        self.recorder = SessionRecorder() if record and replay is None else None
+        self.mark_startup('data')
+        desktop = pygame.display.Info()  # the desktop's size, as set_mode wasn't called yet
+        self.size = max(MIN_SIZE, min(desktop.current_w, desktop.current_h) - 320)  # room for the taskbar and the title bar
         self.screen = pygame.display.set_mode((self.size, self.size), pygame.RESIZABLE)
         pygame.display.set_caption('BLACK SHEEP')
-        self.opening_page()
+        self.screen.fill(colores['BROWN'])  # a frame at once, while the first page loads
+        pygame.display.flip()
+        self.mark_startup('display')
+        # the images of the other pages load while the first one is shown
+        threading.Thread(target=self.preload, args=(startup_report,), name='preload', daemon=True).start()
+        self.scenes = SceneManager()  # switches between the pages, so they don't call each other
+        if replay is None:
+            self.scenes.run(self.opening_page)
+        else:
+            self.scenes.run(self.replay_page, replay)
+
+    def mark_startup(self, phase):
+        if self.startup:
+            self.startup.mark(phase)
+
+    def preload(self, report=False):
+        """
+        Loads the backgrounds of the pages and the sprites of the board at the current size into the assets cache
+        :param report: whether to print the time it took
+        """
+        start = time.perf_counter()
+        images = [(os.path.join(IMAGES_DIR, image), (self.size, self.size), None)
+                  for image in ('BlackSheepSign.png', 'Black_sheep_bass.png', 'Black_sheep_sign_blur.png')]
+        count = assets.preload(images + get_sprite_images(self.size))
+        if report:
+            print(f'{"preload (background)":20} {(time.perf_counter() - start) * 1000:9.2f} ms, {count} images')
+
+    def handle_event(self, event):
+        """
+        Handles the events that mean the same on every page
+        """
+        if event.type == pygame.QUIT:
+            if self.recorder:
+                self.recorder.close()
+            pygame.quit()
+            sys.exit()
+        if event.type == pygame.VIDEORESIZE:
+            self.resize(event.w, event.h)
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F3:
+                self.profiler.toggle()
+            elif event.key == pygame.K_F4:
+                self.profiler.dump_all()
+
+    def resize(self, width, height):
+        """
+        Lays the pages out again for a window of the new size, squared to its shorter side.
+        The current page is entered again so everything is rebuilt from self.size, the scaled images come from the
+        assets cache, so each image is scaled once per size
+        """
+        size = max(MIN_SIZE, min(width, height))
+        if size == self.size and self.screen.get_size() == (size, size):
+            return  # the event of the window squared below
+        self.size = size
+        self.screen = pygame.display.set_mode((self.size, self.size), pygame.RESIZABLE)
+        scene, args = self.scenes.get_current_scene()
+        self.scenes.switch(scene, *args)
 
     def opening_page(self):
         background = BackgroundImage(self.screen, (self.size, self.size), os.path.join(IMAGES_DIR, 'BlackSheepSign.png'))
@@ -33,76 +118,122 @@ class BlackSheep:
         background.add_text('to', int(self.size/1.22), int(self.size/6.67), size=int(self.size/30.0), color=colores['BLACK'], font='Arial Black')
         background.add_text('Black Sheep!', int(self.size/1.46), int(self.size/5.41), size=int(self.size/20.0), color=colores['BLACK'], font='Viner Hand ITC.')
         button = background.add_button(int(self.size/1.3), int(self.size/4.14), int(self.size/7.5), int(self.size/17.14), color=colores['RED'], text='Start',
-                                       text_color=colores['WHITE'], onclick_function=self.menu_page)
+                                       text_color=colores['WHITE'], onclick_function=self.scenes.switch, onclick_args=(self.menu_page,))
         hover_button = background.add_hover_button(int(self.size/1.62), int(self.size/30.0), int(self.size/7.5), int(self.size/17.14), color=colores['YELLOW'],
                                                    text='Hover for instructions',
-                                                   onclick_function=self.instructions_page)
+                                                   onclick_function=self.scenes.switch, onclick_args=(self.instructions_page,))
 
-        run_background = True
-        while run_background:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+        self.scheduler.enter(SCENE_FPS['opening_page'])
+        while not self.scenes.is_switching():
+            events = self.scheduler.get_events()
+            self.profiler.start_frame()
+            pointer.update()  # the mouse state of the whole frame
+            for event in events:
+                self.handle_event(event)
+            self.profiler.mark('events')
 
             background.draw()
+            self.profiler.mark('render')
             button.appear()
             hover_button.appear()
+            self.profiler.mark('ui')
+            self.profiler.draw_overlay(self.screen)
+            pointer.apply_cursor()
             pygame.display.flip()
-            self.clock.tick(FPS)
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+            if self.startup:
+                self.startup.mark('opening page')
+                self.startup.print()
+                self.startup = None
+            self.scheduler.tick()
 
     def menu_page(self):
         background = BackgroundImage(self.screen, (self.size, self.size), os.path.join(IMAGES_DIR, 'Black_sheep_bass.png'))
         background.add_text('Choose your level', int(self.size/60.0), int(self.size/1.54), size=int(self.size/15.0), font='Viner Hand ITC.', color=colores['YELLOW'])
-        input_box = background.add_input_box(x=int(self.size/30.0), y=int(self.size/1.2), width=int(self.size/18.18), height=int(self.size/15.0), prompt='Choose a level from 1 to 48: ',
-                                             prompt_above=False, limit=2)
+        input_box = background.add_input_box(x=int(self.size/30.0), y=int(self.size/1.2), width=int(self.size/18.18), height=int(self.size/15.0), prompt=f'Choose a level from 1 to {len(self.levels)}: ',
+                                             prompt_above=False, limit=len(str(len(self.levels))))
 
-        run_background = True
-        while run_background:
-            for event in pygame.event.get():
+        self.scheduler.enter(SCENE_FPS['menu_page'])
+        while not self.scenes.is_switching():
+            events = self.scheduler.get_events()
+            self.profiler.start_frame()
+            pointer.update()  # the mouse state of the whole frame
+            for event in events:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN:
                         number = input_box.get_user_input()
                         number = int(number) if number.isdigit() else 0
-                        if 0 < number < 49:
-                            self.main_game(number)
+                        if 0 < number <= len(self.levels):
+                            self.scenes.switch(self.main_game, number)
                 input_box.handle_events(event)
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                self.handle_event(event)
+            self.profiler.mark('events')
 
             background.draw()
+            self.profiler.mark('render')
             input_box.appear()
+            self.profiler.mark('ui')
+            self.profiler.draw_overlay(self.screen)
+            pointer.apply_cursor()
             pygame.display.flip()
-            self.clock.tick(FPS)
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+            self.scheduler.tick()
 
-    def main_game(self, level):
+    def main_game(self, level, position=None):
+        """
+        :param position: the (mask, black) to resume the level at, after the window was resized
+        """
         active_ball = None
         active_game = True
-        order = orders[level - 1]
-        board = Board(self.screen, (self.size, self.size), white_order=order[:-1], black_ball_loc=order[-1],
-                      color=colores['BLACK1'])
+        board = self.prefetcher.take(self.screen, self.size, level) if position is None else None
+        if board is None:
+            if position is None:
+                order = self.levels.get_order(level)
+            else:
+                order = make_order(*position)
+            board = Board(self.screen, (self.size, self.size), white_order=order[:-1], black_ball_loc=order[-1],
+                          color=colores['BLACK1'])
         board.add_text(f'LEVEL {level}', int(self.size/60.0), int(self.size/300.0), size=int(self.size/17.14), color=colores['YELLOW'], font='Arial black')
-        buttons = [board.add_button(x=int(self.size/2.73), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Go back to menu.', onclick_function=self.menu_page)]
+        buttons = [board.add_button(x=int(self.size/2.73), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Go back to menu.', onclick_function=self.scenes.switch, onclick_args=(self.menu_page,))]
+        self.hints.prepare(*board.get_position())  # so no search is needed during the game
+        if self.recorder and position is None:
+            self.recorder.start_level(level)
+        resized = False
+        hint_move = None
+        hint_version = None  # the board version the hint was found for
+        warned = False
 
-        running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+        self.scheduler.enter(SCENE_FPS['main_game'])
+        while not self.scenes.is_switching():
+            events = self.scheduler.get_events()
+            self.profiler.start_frame()
+            pointer.update()  # the mouse state of the whole frame
+            for event in events:
+                self.handle_event(event)
+                if event.type == pygame.VIDEOEXPOSE:
+                    board.invalidate()
+                if event.type == pygame.VIDEORESIZE and self.scenes.is_switching():
+                    resized = True  # the level goes on at the new size
+                    self.scenes.switch(self.main_game, level, board.get_position())
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    self.show_hints = not self.show_hints
+            self.profiler.mark('events')
 
-            board.show()
+            # repaint only what changed since the last frame
+            rects = board.show_dirty()
+            self.profiler.mark('render')
             for button in buttons:
-                button.appear()
-
-            balls = board.get_balls()
+                if button.appear():
+                    board.mark_surface_dirty(button.get_rect())
+            self.profiler.mark('ui')
 
             # if there is a ball movement taking place right now, you can't move other balls
             if not board.is_active():
-                for ball in balls:
-                    if ball.is_dragged():
-                        active_ball = board.activate(ball)
+                ball = board.get_ball_at(pointer.get_pos()) if pointer.is_pressed() else None
+                if ball:
+                    active_ball = board.activate(ball)
             else:
                 hole_touched = active_ball.is_touching_hole()  # if there's no a hole colliding, it's set to None
                 possible_destinations = active_ball.get_possible_destinations(
@@ -110,27 +241,150 @@ class BlackSheep:
                 if active_ball.is_dragged():  # if the ball is dragged by the mouse
                     active_ball.follow_mouse()
                 elif hole_touched in possible_destinations:  # if the ball is released at a permitted hole
+                    if self.recorder:
+                        self.recorder.record_move(active_ball.get_hole().get_number(), hole_touched.get_number())
                     active_ball.release_at_hole(hole_touched)
+                    if level < len(self.levels):  # the player is into the level, get the next one ready
+                        self.prefetcher.request(self.screen, self.size, level + 1)
                 else:  # if the ball is released somewhere else across the board
                     active_ball.move_back()
 
+            # in hint mode, mark a winning move, or warn once there's no way to win anymore
+            if self.show_hints and active_game:
+                if hint_version != board.get_version():
+                    hint_version = board.get_version()
+                    hint_move = self.hints.winning_move(*board.get_position())
+                if hint_move is None and not warned and not board.no_possible_movement_left():
+                    warned = True
+                    board.add_text("There's no way to win from here anymore.", int(self.size/60.0), int(self.size/1.08), size=int(self.size/25.0),
+                                   box=True, color=colores['YELLOW'], box_color=colores['RED'])
+                if hint_move and not board.is_active():
+                    for number in (hint_move[0], hint_move[2]):
+                        board.mark_dirty(board.get_hole(number).highlight_hole(color=colores['GREEN']))
+
             if board.no_possible_movement_left() and not board.is_active() and active_game:
                 active_game = False
+                if self.recorder:
+                    self.recorder.end_level(WON if board.win() else STUCK)
                 if board.win():
-                    if level < 48:
+                    if level < len(self.levels):
                         board.add_text('Hooray! You won.', int(self.size/12.0), int(self.size/1.11), size=int(self.size/12.5), box=True, color=colores['RED'],
                                        box_color=colores['YELLOW'])
-                        buttons.append(board.add_button(x=int(self.size/1.28), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Next level', onclick_function=self.main_game, onclick_args=(level + 1,), one_press=True))
+                        buttons.append(board.add_button(x=int(self.size/1.28), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Next level', onclick_function=self.scenes.switch, onclick_args=(self.main_game, level + 1), one_press=True))
                     else:
                         board.add_text('WOW, You definitely cracked the system...', x=int(self.size/60.0), y=int(self.size/1.09), size=int(self.size/15.38), box=True, color=colores['RED'], box_color=colores['YELLOW'])
                 else:
+                    self.prefetcher.request(self.screen, self.size, level)  # for trying again
                     board.add_text("Stuck?  Never mind,  Maybe  you'll  succeed  next  time.", int(self.size/60.0), int(self.size/1.08), size=int(self.size/25.0),
                                    box=True, color=colores['YELLOW'], box_color=colores['RED'], font='Viner Hand ITC.')
 
-                    buttons.append(board.add_button(x=int(self.size/1.28), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Try again', onclick_function=self.main_game, onclick_args=(level,), one_press=True))
+                    buttons.append(board.add_button(x=int(self.size/1.28), y=int(self.size/60.0), width=int(self.size/60.0), height=int(self.size/17.14), text='Try again', onclick_function=self.scenes.switch, onclick_args=(self.main_game, level), one_press=True))
 
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.profiler.mark('logic')
+            overlay = self.profiler.draw_overlay(self.screen)
+            if overlay:
+                board.mark_dirty(overlay)
+            pointer.apply_cursor()
+            pygame.display.update(rects + board.get_dirty_rects())
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+            self.scheduler.tick(active=board.is_active())
+
+        if active_game and self.recorder and not resized:
+            self.recorder.end_level(LEFT)
+
+    def replay_page(self, path, resume=None):
+        """
+        Shows a session log at the speed it was played, then goes back to the opening page
+        :param resume: the (records, record, start, finished, level, position, error, outcome) to go on from,
+                       after the window was resized
+        """
+        if resume is None:
+            records = read_session(path)
+            record = next(records, None)
+            start = time.monotonic()
+            finished = None  # the time the last record was shown
+            level = position = outcome = None
+            error = None  # what doesn't fit the rules in the level being replayed
+        else:
+            records, record, start, finished, level, position, error, outcome = resume
+        board = None
+
+        def show_level(order):
+            nonlocal board
+            board = Board(self.screen, (self.size, self.size), white_order=order[:-1], black_ball_loc=order[-1],
+                          color=colores['BLACK1'])
+            board.add_text(f'REPLAY OF LEVEL {level}', int(self.size/60.0), int(self.size/300.0), size=int(self.size/17.14), color=colores['YELLOW'], font='Arial black')
+            if error:
+                show_error(error)
+            if outcome is not None:
+                show_outcome()
+
+        def show_outcome():
+            board.add_text(f'The level was {OUTCOMES.get(outcome)}.', int(self.size/60.0), int(self.size/1.08), size=int(self.size/25.0),
+                           box=True, color=colores['YELLOW'], box_color=colores['RED'])
+
+        def show_error(text):
+            board.add_text(text, int(self.size/60.0), int(self.size/1.16), size=int(self.size/25.0),
+                           box=True, color=colores['YELLOW'], box_color=colores['RED'])
+            return text
+
+        if position is not None:
+            show_level(make_order(*position))
+
+        self.scheduler.enter(SCENE_FPS['replay_page'])
+        while not self.scenes.is_switching():
+            events = self.scheduler.get_events()
+            self.profiler.start_frame()
+            pointer.update()  # the mouse state of the whole frame
+            for event in events:
+                self.handle_event(event)
+                if event.type == pygame.VIDEOEXPOSE and board:
+                    board.invalidate()
+                if event.type == pygame.VIDEORESIZE and self.scenes.is_switching():
+                    # the replay goes on at the new size, from the record it's at
+                    resume = (records, record, start, finished, level, board and board.get_position(), error, outcome)
+                    self.scenes.switch(self.replay_page, path, resume)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    self.scenes.switch(self.opening_page)
+            self.profiler.mark('events')
+
+            # apply every record whose time has come
+            elapsed = (time.monotonic() - start) * 1000  # the records are timed in milliseconds
+            while record is not None and record.time <= elapsed:
+                if record.kind == LEVEL_START:
+                    # a log may not fit the pack, its bad levels and moves are shown as replay_headless reports them
+                    level, outcome = record.level, None
+                    error = None if 0 < level <= len(self.levels) else f'Level {level} is not in the pack.'
+                    show_level(self.levels.get_order(level) if error is None else [None])
+                elif record.kind == LEVEL_END and board:
+                    outcome = record.outcome
+                    show_outcome()
+                elif board and error is None:
+                    move = find_move(*board.get_position(), *record.move)
+                    if move is None:
+                        error = show_error(f'The move {record.move[0]}->{record.move[1]} is not legal.')
+                    else:
+                        ball = board.get_hole(move[0]).get_ball()
+                        board.activate(ball)
+                        ball.start_moving()
+                        ball.release_at_hole(board.get_hole(move[2]))
+                record = next(records, None)
+            if record is None:
+                finished = elapsed if finished is None else finished
+                if elapsed - finished > 2000:  # leave the end on screen for 2 seconds
+                    self.scenes.switch(self.opening_page)
+            self.profiler.mark('logic')
+
+            rects = board.show_dirty() if board else []
+            self.profiler.mark('render')
+            overlay = self.profiler.draw_overlay(self.screen)
+            if overlay and board:
+                board.mark_dirty(overlay)
+            pygame.display.update(rects + (board.get_dirty_rects() if board else []))
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+            self.scheduler.tick(active=True)
 
     def instructions_page(self):
         page = BackgroundImage(self.screen, (self.size, self.size), os.path.join(IMAGES_DIR, 'Black_sheep_sign_blur.png'))
@@ -144,7 +398,8 @@ class BlackSheep:
             "5) though, if there's a black ball, it will be the one left.",
             "6) you have to figure out the way to solve an order at the ",
             "   beginning, Once you've moved, there's no moving back.",
-            "7) So stay focused and 1 2 3..."]
+            "7) So stay focused and 1 2 3...",
+            "8) Stuck? press H during a game for a hint."]
 
         hover_button = page.add_hover_button(int(self.size/1.62), int(self.size/30.0), int(self.size/2.5), int(self.size/17.14), color=colores['BRIGHT YELLOW'], text='Leave to go back',
                                              text_color=colores['BROWN'])
@@ -155,18 +410,25 @@ class BlackSheep:
             page.add_text(line,  int(self.size/60.0), line_size, size=int(self.size/33.33), font='Arial black', color=colores['BLACK']).appear()
             line_size += int(self.size/13.33)
 
-        run_background = True
-        while run_background:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+        self.scheduler.enter(SCENE_FPS['instructions_page'])
+        while not self.scenes.is_switching():
+            events = self.scheduler.get_events()
+            self.profiler.start_frame()
+            pointer.update()  # the mouse state of the whole frame
+            for event in events:
+                self.handle_event(event)
             if not hover_button.get_hovered():
-                run_background = False
-                self.opening_page()
+                self.scenes.switch(self.opening_page)
+            self.profiler.mark('events')
 
             page.draw()
+            self.profiler.mark('render')
             hover_button.appear()
+            self.profiler.mark('ui')
+            self.profiler.draw_overlay(self.screen)
+            pointer.apply_cursor()
 
             pygame.display.flip()
-            self.clock.tick(FPS)
+            self.profiler.mark('flip')
+            self.profiler.end_frame()
+            self.scheduler.tick()
@@ -1,53 +1,88 @@
 import pygame
 import os
-from pathlib import Path
-from itertools import permutations
+import time
 
 from .colores import colores
+from .Assets import assets, IMAGES_DIR
 from .Backgrounds import Background
+from .Input import pointer, HoleIndex
+from .geometry import CLASSIC
 
 
-IMAGES_DIR = os.path.join(Path(__file__).parent.parent, 'assets', 'images')
+BASE_SIZE = 600  # the board size the measures below are given for, they're scaled to the actual size
+
+HOLE_IMAGE = os.path.join(IMAGES_DIR, 'hole.png')
+BALL_IMAGE = os.path.join(IMAGES_DIR, 'bright_ball.png')
+BLACK_BALL_IMAGE = os.path.join(IMAGES_DIR, 'black_sheep_no_background.png')
+
+
+def get_half_distance(size, geometry=CLASSIC):
+    """
+    :return: the distance between two holes half a step apart on a board of the size,
+             the holes of a geometry wider than the classic one are closer
+    """
+    scale = size / BASE_SIZE
+    return (size - 2 * 75 * scale) / (max(geometry.get_extent()) + 70 / 95)
+
+
+def get_sprite_sizes(size, geometry=CLASSIC):
+    """
+    :return: the (hole, ball, black ball) sizes on a board of the size
+    """
+    half_distance = get_half_distance(size, geometry)
+    return round(70 / 95 * half_distance), round(50 / 95 * half_distance), round(85 / 95 * half_distance)
+
+
+def get_sprite_images(size, geometry=CLASSIC):
+    """
+    :return: the (path, size, colorkey) of every sprite image of a board of the size, as the assets cache takes them
+    """
+    hole_size, ball_size, black_ball_size = get_sprite_sizes(size, geometry)
+    return [(HOLE_IMAGE, (hole_size, hole_size), colores['WHITE']),
+            (BALL_IMAGE, (ball_size, ball_size), colores['WHITE']),
+            (BLACK_BALL_IMAGE, (black_ball_size, black_ball_size), colores['WHITE'])]
+
+
+_hole_indexes = {}  # (geometry, board size, screen size, ball size) -> HoleIndex, the holes are at the same pixels on every board of a size and geometry
 
 
 class Board(Background):
 
     def __init__(self, screen, size: tuple, white_order=(0, 1, 2, 4, 6, 8, 12), black_ball_loc=7, text=None,
-                 color=colores['BEIGE']):
+                 color=colores['BEIGE'], geometry=CLASSIC):
         super().__init__(screen, size, text, color)
-        self.hole_size = 70  # configure hole size
-        self.edge = 75  # configure distance from edge of screen to outer holes
-        self.distance = 190  # distance between holes including hole size
-        self.half_distance = self.distance / 2
+        self.geometry = geometry  # the layout of the holes and the rules of the board
+        self.scale = self.size[0] / BASE_SIZE
+        self.hole_size, self.ball_size, self.black_ball_size = get_sprite_sizes(self.size[0], geometry)  # configure hole and ball sizes
+        self.edge = 75 * self.scale  # configure distance from edge of screen to outer holes
+        self.half_distance = get_half_distance(self.size[0], geometry)
+        self.distance = self.half_distance * 2  # distance between holes including hole size
         self.edge2 = self.edge + self.half_distance  # configure distance from edge of screen to middle holes
-        self.start = pygame.time.get_ticks()
+        self.margin = round(50 * self.scale)  # the width of the frame around the middle square
+        self.start = time.monotonic()  # the time the board was made
         self.holes_group = self.create_holes()  # create a group to store the holes
+        self.holes = {hole.get_number(): hole for hole in self.holes_group}
+        self.mask, self.black = geometry.make_position(white_order, black_ball_loc)  # the position as seen by the rules engine
+        self.moves = set(geometry.legal_moves(self.mask, self.black))  # the legal moves, updated on every move
+        self.version = 0  # counts the moves made, so cached results can tell if the board has changed
         self.balls_group = self.create_balls(white_order, black_ball_loc)  # create a group to store the balls
-        self.possibilities = self.get_permutations()  # find all permutations of 3 contiguous holes in a straight line
+        self.possibilities = self.get_permutations()  # all the triples of 3 contiguous holes in a straight line
         self.update_possibilities_per_hole()  # update each hole for its possibilities
         self.active_movement = False  # True if a ball movement is taking place right now
         self.active_ball = False
         self.screen_shots = []
+        self.middle_square = pygame.Surface((self.size[0] - 2 * self.margin, self.size[0] - 2 * self.margin))
+        self.middle_square.fill(colores['BEIGE'])
+        self.dirty_rects = []  # screen regions changed since they were last repainted
+        self.full_redraw = True  # True if the whole board has to be repainted
 
     def create_holes(self):
 
         holes_group = pygame.sprite.Group()
 
-        holes_locations = [
-            (self.edge, self.edge),
-            (self.edge + self.distance, self.edge),
-            (self.edge + self.distance * 2, self.edge),
-            (self.edge2, self.edge2),
-            (self.edge2 + self.distance, self.edge2),
-            (self.edge, self.edge + self.distance),
-            (self.edge + self.distance, self.edge + self.distance),
-            (self.edge + self.distance * 2, self.edge + self.distance),
-            (self.edge2, self.edge2 + self.distance),
-            (self.edge2 + self.distance, self.edge2 + self.distance),
-            (self.edge, self.edge + self.distance * 2),
-            (self.edge + self.distance, self.edge + self.distance * 2),
-            (self.edge + self.distance * 2, self.edge + self.distance * 2)
-        ]
+        # the points of the geometry are in half distances, so the middle holes of the classic board fall at edge2
+        holes_locations = [(round(self.edge + self.half_distance * x), round(self.edge + self.half_distance * y))
+                           for x, y in self.geometry.points]
         holes = [Hole(self.hole_size, holes_locations[i], i, self.screen) for i in range(len(holes_locations))]
 
         for hole in holes:
@@ -55,33 +90,56 @@ class Board(Background):
 
         return holes_group
 
-    def get_permutations(self):
+    def get_touched_hole(self, rect):
         """
-        :return: a list of tuples of all possible triples of holes
+        :return: the only hole a ball at rect collides with, or None if it collides with none or with more than one
         """
-        permutations3 = permutations(self.holes_group, 3)  # all the 3 holes combinations
-        # filter all the permutations that are not in one line or not with the same distance between them
-        line_permutations = [permutation for permutation in permutations3 if self.one_line(permutation)]
-        return line_permutations
+        key = (self.geometry.name, self.size, self.screen.get_size(), rect.size)
+        index = _hole_indexes.get(key)
+        if index is None:
+            # a ball collides with a hole if its center is in the hole's rect grown by the ball's size
+            width, height = rect.size
+            index = _hole_indexes[key] = HoleIndex(
+                {number: pygame.Rect(hole.rect.left - (width - width // 2) + 1, hole.rect.top - (height - height // 2) + 1,
+                                     hole.rect.width + width - 1, hole.rect.height + height - 1)
+                 for number, hole in self.holes.items()}, self.screen.get_size())
+        number = index.get_hole(rect.center)
+        return None if number is None else self.holes[number]
+
+    def get_ball_at(self, point):
+        """
+        :return: the ball at the point, or None if there's none
+        """
+        key = (self.geometry.name, self.size, self.screen.get_size(), None)  # the holes whose ball may be under a pixel
+        index = _hole_indexes.get(key)
+        if index is None:
+            size = max(self.ball_size, self.black_ball_size)
+            index = _hole_indexes[key] = HoleIndex({number: pygame.Rect(0, 0, size, size).move(hole.rect.centerx - size // 2, hole.rect.centery - size // 2)
+                                                    for number, hole in self.holes.items()}, self.screen.get_size())
+        holes = index.get_holes(point)
+        while holes:
+            number = holes.bit_length() - 1
+            holes ^= 1 << number
+            ball = self.holes[number].get_ball()
+            if ball and ball.rect.collidepoint(point):
+                return ball
+        return None
 
-    def one_line(self, permutation):
+    def get_permutations(self):
         """
-        Filters triples that are not in one line or not contiguous
+        :return: a list of tuples of all possible triples of holes, taken from the jump table of the geometry
         """
-        a, b, c, = [i.rect for i in permutation]
-        return a.x - b.x == b.x - c.x and a.y - b.y == b.y - c.y and not \
-            [i.get_number() for i in permutation] in [[0, 6, 12], [2, 6, 10], [12, 6, 0], [10, 6, 2]]
+        return [self.get_triple(jump) for jump in self.geometry.jumps]
+
+    def get_triple(self, jump):
+        return tuple(self.holes[number] for number in jump)
 
     def update_possibilities_per_hole(self):
         """
-        Find all the possible destinations for each hole, and update the hole
+        Update each hole for the triples starting at it, as indexed by the jump table of the geometry
         """
         for hole in self.holes_group:
-            possibilities = []
-            for permutation in self.possibilities:
-                if hole == permutation[0]:
-                    possibilities.append(permutation)
-            hole.update_possibilities(possibilities)
+            hole.update_possibilities([self.get_triple(jump) for jump in self.geometry.jumps_from[hole.get_number()]])
 
     def create_balls(self, white_balls, black_ball=None):
         """
@@ -90,11 +148,11 @@ class Board(Background):
         balls_group = pygame.sprite.Group()
         for hole in self.holes_group:
             if hole.number in white_balls:
-                ball = Ball(hole, self)
+                ball = Ball(hole, self, size=(self.ball_size, self.ball_size))
                 hole.fill(ball)
                 balls_group.add(ball)
             elif hole.number == black_ball:
-                ball = Ball(hole, self, color='black', size=(85, 85))
+                ball = Ball(hole, self, color='black', size=(self.black_ball_size, self.black_ball_size))
                 hole.fill(ball)
                 balls_group.add(ball)
         return balls_group
@@ -103,20 +161,100 @@ class Board(Background):
         """
         Show the board
         """
-        middle_square = pygame.Surface((self.size[0] - 100, self.size[0] - 100))
-        middle_square.fill(colores['BEIGE'])
-        edge = (self.screen.get_rect().width - self.size[0]) // 2
-        self.surface.blit(middle_square, (50, 50))
+        edge = self.get_edge()
+        self.surface.blit(self.middle_square, (self.margin, self.margin))
         self.screen.blit(self.surface, (edge, edge))
         self.holes_group.draw(self.screen)
         self.balls_group.draw(self.screen)
 
+    def show_dirty(self):
+        """
+        Repaint only the regions of the board marked as dirty, or all of it after invalidate
+        :return: a list of the repainted screen rects, to pass to pygame.display.update
+        """
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty_rects = []
+            self.show()
+            return [self.screen.get_rect()]
+        rects = self.dirty_rects
+        self.dirty_rects = []
+        edge = self.get_edge()
+        for rect in rects:
+            self.screen.set_clip(rect)
+            self.screen.blit(self.surface, (edge, edge))
+            self.holes_group.draw(self.screen)
+            self.balls_group.draw(self.screen)
+        self.screen.set_clip(None)
+        return rects
+
+    def get_edge(self):
+        """
+        :return: the distance of the board surface from the edge of the screen
+        """
+        return (self.screen.get_rect().width - self.size[0]) // 2
+
+    def mark_dirty(self, rect):
+        """
+        Mark a region of the screen to be repainted on the next frame
+        """
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def mark_surface_dirty(self, rect):
+        """
+        Mark a region of the board surface to be repainted on the next frame
+        """
+        edge = self.get_edge()
+        self.mark_dirty(pygame.Rect(rect).move(edge, edge))
+
+    def get_dirty_rects(self):
+        return self.dirty_rects
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def add_text(self, *args, **kwargs):
+        text = super().add_text(*args, **kwargs)
+        self.invalidate()
+        return text
+
+    def add_button(self, *args, **kwargs):
+        button = super().add_button(*args, **kwargs)
+        self.invalidate()
+        return button
+
     def get_balls(self):
         return self.balls_group
 
     def get_holes(self):
         return self.holes_group
 
+    def get_hole(self, number):
+        return self.holes[number]
+
+    def get_position(self):
+        return self.mask, self.black
+
+    def make_move(self, move):
+        """
+        Applies a legal move to the position of the board,
+        and updates the legal moves for the jumps touching the 3 holes that changed
+        """
+        self.mask, self.black = self.geometry.apply_move(self.mask, self.black, move)
+        self.version += 1
+        for number in move:
+            for jump in self.geometry.jumps_touching[number]:
+                if self.geometry.is_legal(self.mask, self.black, jump):
+                    self.moves.add(jump)
+                else:
+                    self.moves.discard(jump)
+
+    def get_moves(self):
+        return self.moves
+
+    def get_version(self):
+        return self.version
+
     def change_moving_state(self):
         self.active_movement = not self.active_movement
 
@@ -132,23 +270,18 @@ class Board(Background):
         return self.active_ball
 
     def no_possible_movement_left(self):
-        possibilities = []
-        for ball in self.balls_group:
-            possibilities.extend(ball.get_filtered_possibilities())
-        return len(possibilities) == 0
+        return not self.moves
 
     def win(self):
-        return len(self.balls_group) == 1
+        return self.geometry.is_win(self.mask)
 
 
 class Ball(pygame.sprite.Sprite):
 
     def __init__(self, hole, board, color='w', size=(50, 50)):
         super().__init__()
-        image = os.path.join(IMAGES_DIR, 'bright_ball.png') if color == 'w' else os.path.join(IMAGES_DIR, 'black_sheep_no_background.png')
-        img = pygame.image.load(image).convert()
-        self.image = pygame.transform.scale(img, size)
-        self.image.set_colorkey(colores['WHITE'])
+        image = BALL_IMAGE if color == 'w' else BLACK_BALL_IMAGE
+        self.image = assets.get(image, size, colores['WHITE'])
         self.hole = hole
         self.color = color
         self.rect = self.image.get_rect()
@@ -156,27 +289,26 @@ class Ball(pygame.sprite.Sprite):
         self.last_rect = self.rect.copy()
         self.moving = False
         self.board = board
+        self.destinations = []
+        self.destinations_key = None  # the (board version, hole) the destinations were found for
 
     def change_position(self, center=tuple):
         self.rect.center = center
 
     def is_hovered(self):
-        mouse_point = pygame.mouse.get_pos()
-        if self.rect.collidepoint(mouse_point):
-            return True
-        return False
+        return pointer.is_over(self.rect)
 
     def is_dragged(self):
-        return self.is_hovered() and pygame.mouse.get_pressed()[0]
+        return pointer.is_pressed() and self.is_hovered()
 
     def follow_mouse(self):
         self.start_moving()
-        self.rect.center = pygame.mouse.get_pos()
+        self.board.mark_dirty(self.rect)
+        self.rect.center = pointer.get_pos()
+        self.board.mark_dirty(self.rect)
 
     def is_touching_hole(self):
-        collisions = pygame.sprite.spritecollide(self, self.board.get_holes(), dokill=False)
-        if len(collisions) == 1:
-            return collisions[0]
+        return self.board.get_touched_hole(self.rect)
 
     def release_at_hole(self, hole):
         """
@@ -184,15 +316,19 @@ class Ball(pygame.sprite.Sprite):
         """
 
         self.board.change_moving_state()
-        possibilities = self.get_filtered_possibilities()  # get all the possible destinations from the new hole
-        for possibility in possibilities:
-            # if the destination hole is in a possible series with the current hole, you are allowed to proceed
-            if hole == possibility[2]:
-                bypassed_hole = possibility[1]  # update the bypassed hole
-                bypassed_ball = bypassed_hole.get_ball()  # update the bypassed ball
-                bypassed_ball.kill()  # kills the bypassed ball
-                bypassed_hole.empty()  # empties the bypassed hole
+        self.board.mark_dirty(self.rect)
+        mask, black = self.board.get_position()
+        move = self.board.geometry.find_move(mask, black, self.hole.get_number(), hole.get_number())
+        # if the destination hole is in a possible series with the current hole, you are allowed to proceed
+        if move:
+            self.board.make_move(move)
+            bypassed_hole = self.board.get_hole(move[1])  # update the bypassed hole
+            bypassed_ball = bypassed_hole.get_ball()  # update the bypassed ball
+            self.board.mark_dirty(bypassed_ball.rect)
+            bypassed_ball.kill()  # kills the bypassed ball
+            bypassed_hole.empty()  # empties the bypassed hole
         self.rect.center = hole.rect.center  # set the ball at the new hole
+        self.board.mark_dirty(self.rect)
         self.last_rect = self.rect.copy()  # set the last location to be the new hole (you can't retreat anyway)
         self.stop_moving()
         self.hole = hole  # set its new hole
@@ -200,12 +336,14 @@ class Ball(pygame.sprite.Sprite):
 
     def move_back(self):
         self.board.change_moving_state()
+        self.board.mark_dirty(self.rect)
         self.rect = self.last_rect.copy()
+        self.board.mark_dirty(self.rect)
         self.hole.fill(self)
         self.stop_moving()
 
     def start_moving(self):
-        self.get_hole().highlight_hole()
+        self.board.mark_dirty(self.get_hole().highlight_hole())
         if not self.moving:
             self.moving = True
             self.last_rect = self.rect.copy()
@@ -221,21 +359,21 @@ class Ball(pygame.sprite.Sprite):
         return self.hole
 
     def get_filtered_possibilities(self):
-        possibilities = self.hole.get_possibilities()
-        filtered_possibilities = []
-        for possibility in possibilities:
-            if possibility[1].is_full() and not possibility[1].is_full(color='b') and not possibility[2].is_full():
-                filtered_possibilities.append(possibility)
-        return filtered_possibilities
+        moves = self.board.get_moves()
+        return [self.board.get_triple(jump) for jump in self.board.geometry.jumps_from[self.hole.get_number()] if jump in moves]
 
     def get_possible_destinations(self, highlight=False):
-        holes = []
-        filtered_possibilities = self.get_filtered_possibilities()
-        for possibility in filtered_possibilities:
-            if highlight:
-                possibility[2].highlight_hole(color='blue')
-            holes.append(possibility[2])
-        return holes
+        """
+        :return: the holes the ball can move to, found once per position, so dragging doesn't search them every frame
+        """
+        key = (self.board.get_version(), self.hole)
+        if key != self.destinations_key:
+            self.destinations = [possibility[2] for possibility in self.get_filtered_possibilities()]
+            self.destinations_key = key
+        if highlight:
+            for hole in self.destinations:
+                self.board.mark_dirty(hole.highlight_hole(color='blue'))
+        return self.destinations
 
 
 
@@ -244,9 +382,7 @@ class Hole(pygame.sprite.Sprite):
     def __init__(self, hole_size, position, number, screen):
         super().__init__()
         self.ball = None
-        img = pygame.image.load(os.path.join(IMAGES_DIR, 'hole.png')).convert()
-        self.image = pygame.transform.scale(img, (hole_size, hole_size)).convert()
-        self.image.set_colorkey(colores['WHITE'])
+        self.image = assets.get(HOLE_IMAGE, (hole_size, hole_size), colores['WHITE'])
         self.rect = self.image.get_rect()
         self.rect.x = position[0]
         self.rect.y = position[1]
@@ -256,6 +392,8 @@ class Hole(pygame.sprite.Sprite):
         self.full = False
         self.full_black = False
         self.possibilities = []
+        self.highlight_radius = round(hole_size * 5 / 7)
+        self.highlight_width = max(1, round(hole_size / 10))
 
     def get_number(self):
         return self.number
@@ -284,7 +422,10 @@ class Hole(pygame.sprite.Sprite):
         self.ball = None
 
     def highlight_hole(self, color=colores['RED']):
-        pygame.draw.circle(self.screen, color, self.rect.center, 50, 7)
+        """
+        :return: the rect of the highlight
+        """
+        return pygame.draw.circle(self.screen, color, self.rect.center, self.highlight_radius, self.highlight_width)
 
     def update_ball(self, ball):
         self.ball = ball
@@ -1,5 +1,7 @@
 import pygame
 from modules.colores import colores
+from modules.Fonts import fonts
+from modules.Input import pointer
 
 
 class Button:
@@ -18,33 +20,32 @@ class Button:
         self.alreadyPressed = False
         self.color = color
         self.text_color = text_color
-        self.font = pygame.font.SysFont(font, int(self.height * 0.85))
+        self.font = fonts.get_font(font, int(self.height * 0.85))
         self.onclick_args = onclick_args
         self.fillColors = {
             'normal': self.color,
             'hover': tuple(max(component - 45, 0) for component in self.color),
             'pressed': '#333333',
         }
-        self.textSurf = self.font.render(text, True, self.text_color)
+        self.textSurf = fonts.render(font, int(self.height * 0.85), text, self.text_color)
         if self.textSurf.get_width() > self.width:
             self.width = self.textSurf.get_width() + 2
         self.buttonSurface = pygame.Surface((self.width, self.height))
         self.buttonRect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.state = None  # the state the button was last drawn in
         self.appear()
 
     def appear(self):
         """
-        checks the state of the button and
+        checks the state of the button and draws it if the state has changed
+        :return: True if the button was drawn
         """
-        mouse_pos = pygame.mouse.get_pos()
-        self.buttonSurface.fill(self.fillColors['normal'])
+        state = 'normal'
         self.pressed = False
-        if self.buttonRect.collidepoint(mouse_pos):
-            self.buttonSurface.fill(self.fillColors['hover'])
-            pygame.mouse.set_system_cursor(pygame.SYSTEM_CURSOR_HAND)
-            if pygame.mouse.get_pressed(num_buttons=3)[0]:
-                pygame.mouse.set_system_cursor(pygame.SYSTEM_CURSOR_ARROW)
-                self.buttonSurface.fill(self.fillColors['pressed'])
+        if pointer.is_over(self.buttonRect):
+            state = 'hover'
+            if pointer.is_pressed():
+                state = 'pressed'
                 self.pressed = True
                 if self.onclickFunction:
                     if self.onePress:
@@ -54,15 +55,29 @@ class Button:
                     else:
                         self.onclickFunction(*self.onclick_args)
             else:
+                pointer.set_cursor(pygame.SYSTEM_CURSOR_HAND)
                 self.alreadyPressed = False
-        else:
-            pygame.mouse.set_system_cursor(pygame.SYSTEM_CURSOR_ARROW)
 
+        return self.draw(state)
+
+    def draw(self, state):
+        """
+        draws the button in the given state, unless it's already drawn in it
+        :return: True if the button was drawn
+        """
+        if state == self.state:
+            return False
+        self.state = state
+        self.buttonSurface.fill(self.fillColors[state])
         self.buttonSurface.blit(self.textSurf, [
             self.buttonRect.width / 2 - self.textSurf.get_rect().width / 2,
             self.buttonRect.height / 2 - self.textSurf.get_rect().height / 2
         ])
         self.surface.blit(self.buttonSurface, self.buttonRect)
+        return True
+
+    def get_rect(self):
+        return self.buttonRect
 
     def get_pressed(self):
         """
@@ -80,20 +95,14 @@ class HoverButton(Button):
         super().__init__(surface, x, y, width, height, color, text, font, text_color, onclick_function, onclick_args)
 
     def appear(self):
-        mouse_pos = pygame.mouse.get_pos()
-        self.buttonSurface.fill(self.fillColors['normal'])
-        if self.buttonRect.collidepoint(mouse_pos):
+        if pointer.is_over(self.buttonRect):
             self.hovered = True
             if self.onclickFunction:
                 self.onclickFunction(*self.onclick_args)
         else:
             self.hovered = False
 
-        self.buttonSurface.blit(self.textSurf, [
-            self.buttonRect.width / 2 - self.textSurf.get_rect().width / 2,
-            self.buttonRect.height / 2 - self.textSurf.get_rect().height / 2
-        ])
-        self.surface.blit(self.buttonSurface, self.buttonRect)
+        return self.draw('normal')
 
     def get_hovered(self):
         return self.hovered
@@ -108,7 +117,9 @@ class InputBox:
         self.y = y
         self.width = width
         self.height = height
-        self.font = pygame.font.SysFont(font, int(self.height * 0.85))
+        self.font_name = font
+        self.font_size = int(self.height * 0.85)
+        self.font = fonts.get_font(self.font_name, self.font_size)
         self.user_text = ''
         self.box_surface = pygame.Surface((self.width, self.height))
         self.box_rect = pygame.Rect(self.x, self.y, self.width, self.height)
@@ -127,7 +138,7 @@ class InputBox:
         return self.user_text
 
     def set_prompt(self):
-        self.prompt_surface = self.font.render(self.prompt, True, colores['BLACK'])
+        self.prompt_surface = fonts.render(self.font_name, self.font_size, self.prompt, colores['BLACK'])
         self.prompt_box_surface = pygame.Surface((self.prompt_surface.get_width(), self.height))
         self.prompt_box_rect = pygame.Rect(self.x, self.y, self.prompt_surface.get_width(), self.height)
         TextBox(self.surface, self.prompt, self.x, self.y)
@@ -147,15 +158,13 @@ class InputBox:
             self.surface.blit(self.prompt_box_surface, self.prompt_box_rect)
 
     def set_color_and_activity_state_input_box(self):
-        mouse_pos = pygame.mouse.get_pos()
-        if self.box_rect.collidepoint(mouse_pos):
+        if pointer.is_over(self.box_rect):
             self.active = True
             self.color = self.color_active
-            pygame.mouse.set_system_cursor(pygame.SYSTEM_CURSOR_IBEAM)
+            pointer.set_cursor(pygame.SYSTEM_CURSOR_IBEAM)
         else:
             self.active = False
             self.color = self.color_passive
-            pygame.mouse.set_system_cursor(pygame.SYSTEM_CURSOR_ARROW)
 
     def handle_events(self, event):
         if self.active:
@@ -174,7 +183,7 @@ class InputBox:
     def appear(self):
         self.set_color_and_activity_state_input_box()
 
-        text_surface = self.font.render(self.user_text, True, colores['BLACK'])
+        text_surface = fonts.render(self.font_name, self.font_size, self.user_text, colores['BLACK'])
         self.box_surface.fill(self.color)
 
         self.box_surface.blit(text_surface, [
@@ -185,8 +194,9 @@ class InputBox:
 
         self.surface.blit(self.box_surface, self.box_rect)
 
-        self.box_surface = pygame.transform.scale(self.box_surface,
-                                                  (self.box_rect.width, self.box_surface.get_height()))
+        if self.box_surface.get_width() != self.box_rect.width:
+            self.box_surface = pygame.transform.scale(self.box_surface,
+                                                      (self.box_rect.width, self.box_surface.get_height()))
         self.box_rect.width = max(self.width, text_surface.get_width() + 5)
 
 
@@ -199,7 +209,7 @@ class TextBox:
         self.font = font
         self.text = text
         self.color = color
-        self.text_surface = pygame.font.SysFont(font, self.size).render(text, True, color)
+        self.text_surface = fonts.render(font, self.size, text, color)
         self.box = box
         self.box_surface = pygame.Surface(self.text_surface.get_rect().size) if self.box else None
         self.box_color = box_color
@@ -220,9 +230,11 @@ class TextBox:
 
     def prevent_exceeding(self):
         if self.x < self.surface.get_width():
-            while self.x + self.text_surface.get_rect().width + self.no_exceeding > self.surface.get_width():
-                self.size -= 1
-                self.text_surface = pygame.font.SysFont(self.font, self.size).render(self.text, True, self.color)
+            # find the biggest size that fits by a binary search over the sizes, measuring without rendering
+            size = fonts.fit_size(self.font, self.size, self.text, self.surface.get_width() - self.x - self.no_exceeding)
+            if size != self.size:
+                self.size = size
+                self.text_surface = fonts.render(self.font, self.size, self.text, self.color)
                 self.box_surface = pygame.Surface(self.text_surface.get_rect().size) if self.box else None
         self.width = self.text_surface.get_width()
         self.height = self.text_surface.get_height()
\ No newline at end of file
@@ -0,0 +1,57 @@
+import pygame
+from collections import OrderedDict
+
+
+class FontCache:
+    """
+    Keeps the fonts keyed by (name, size), so each system font is looked up once,
+    and the most recently rendered texts keyed by (name, size, text, color), up to max_texts of them.
+    The rendered surfaces are shared, so copy a surface before drawing on it.
+    """
+
+    def __init__(self, max_texts=512):
+        self.fonts = {}
+        self.texts = OrderedDict()
+        self.max_texts = max_texts
+
+    def get_font(self, name, size):
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.SysFont(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, name, size, text, color, antialias=True):
+        key = (name, size, text, tuple(color), antialias)
+        surface = self.texts.get(key)
+        if surface is not None:
+            self.texts.move_to_end(key)
+            return surface
+        surface = self.get_font(name, size).render(text, antialias, color)
+        self.texts[key] = surface
+        if len(self.texts) > self.max_texts:
+            self.texts.popitem(last=False)
+        return surface
+
+    def fit_size(self, name, size, text, width):
+        """
+        :return: the biggest font size up to size, in which the text is not wider than width (at least 1)
+        """
+        if self.get_font(name, size).size(text)[0] <= width:
+            return size
+        low, high = 1, size - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.get_font(name, middle).size(text)[0] <= width:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def clear(self):
+        self.fonts.clear()
+        self.texts.clear()
+
+
+fonts = FontCache()  # the cache shared by all the widgets of the game
@@ -0,0 +1,103 @@
+import pygame
+
+
+class Pointer:
+    """
+    The state of the mouse, read once per frame, so every widget sees the same position and buttons in a frame.
+    Widgets ask for a cursor with set_cursor, and the cursor is set once at the end of the frame,
+    a cursor other than the arrow wins over the arrow, so the widgets don't overwrite each other.
+    Widgets ask is_over with their rects: a page has a few of them, whose rects change with their text,
+    so testing the rects costs less than keeping them in an index, which only the holes of the board have (HoleIndex).
+    """
+
+    def __init__(self):
+        self.pos = (0, 0)
+        self.pressed = False
+        self.cursor = pygame.SYSTEM_CURSOR_ARROW  # the cursor asked for in this frame
+        self.current_cursor = None  # the cursor that is set
+
+    def update(self):
+        """
+        Takes the snapshot of the frame, call it once at the start of every frame
+        """
+        self.pos = pygame.mouse.get_pos()
+        self.pressed = pygame.mouse.get_pressed()[0]
+        self.cursor = pygame.SYSTEM_CURSOR_ARROW
+
+    def get_pos(self):
+        return self.pos
+
+    def is_pressed(self):
+        return self.pressed
+
+    def is_over(self, rect):
+        """
+        :return: True if the pointer is over the rect in this frame
+        """
+        return rect.collidepoint(self.pos)
+
+    def set_cursor(self, cursor):
+        if cursor != pygame.SYSTEM_CURSOR_ARROW:
+            self.cursor = cursor
+
+    def apply_cursor(self):
+        """
+        Sets the cursor asked for in the frame, if it isn't set already, call it once at the end of every frame
+        """
+        if self.cursor != self.current_cursor:
+            pygame.mouse.set_system_cursor(self.cursor)
+            self.current_cursor = self.cursor
+
+
+class HoleIndex:
+    """
+    Finds the hole at a pixel without testing every hole.
+    Every hole covers a rect, and for every pixel column and pixel row the index keeps a bit mask of the holes covering it,
+    so the holes covering a pixel are the bits set in both the column's and the row's masks.
+    """
+
+    def __init__(self, rects, size):
+        """
+        :param rects: a dictionary of hole number -> the rect the hole covers
+        :param size: the (width, height) of the screen
+        """
+        self.columns = self.build_axis({number: (rect.left, rect.right) for number, rect in rects.items()}, size[0])
+        self.rows = self.build_axis({number: (rect.top, rect.bottom) for number, rect in rects.items()}, size[1])
+
+    @staticmethod
+    def build_axis(spans, length):
+        """
+        :param spans: a dictionary of hole number -> the (start, end) pixels the hole covers on the axis
+        :return: a list of the bit masks of the holes covering every pixel of the axis, filled an interval at a time
+        """
+        masks = [0] * length
+        cuts = sorted({0, length} | {min(max(0, cut), length) for span in spans.values() for cut in span})
+        for start, end in zip(cuts, cuts[1:]):
+            mask = 0
+            for number, (low, high) in spans.items():
+                if low <= start < high:
+                    mask |= 1 << number
+            if mask:
+                masks[start:end] = [mask] * (end - start)
+        return masks
+
+    def get_holes(self, point):
+        """
+        :return: the bit mask of the holes covering the point
+        """
+        x, y = int(point[0]), int(point[1])
+        if 0 <= x < len(self.columns) and 0 <= y < len(self.rows):
+            return self.columns[x] & self.rows[y]
+        return 0
+
+    def get_hole(self, point):
+        """
+        :return: the number of the only hole covering the point, or None if there's none or more than one
+        """
+        holes = self.get_holes(point)
+        if holes and not holes & (holes - 1):
+            return holes.bit_length() - 1
+        return None
+
+
+pointer = Pointer()  # the mouse snapshot shared by all the pages of the game
@@ -0,0 +1,61 @@
+import threading
+
+from .colores import colores
+from .Board import Board
+
+
+class LevelPrefetcher:
+    """
+    Builds the board of a level on a worker thread while another level is played,
+    so entering the level takes the ready board instead of building it in the frame of the click.
+    The hints of the level are prepared on the thread too. One prefetched board is kept at a time.
+    """
+
+    def __init__(self, levels, hints):
+        self.levels = levels
+        self.hints = hints
+        self.thread = None
+        self.key = None  # the (level, size, screen) the board is built for
+        self.board = None
+        self.lock = threading.Lock()  # so a board built for a level no longer wanted isn't kept
+
+    def request(self, screen, size, level):
+        """
+        Starts building the board of the level, unless it's already built or being built.
+        A board still being built for another level isn't waited for, it's dropped once it's built
+        """
+        key = (level, size, screen)
+        with self.lock:
+            if key == self.key:
+                return
+            self.key = key
+            self.board = None
+        self.thread = threading.Thread(target=self.prepare, args=key, name='prefetch', daemon=True)
+        self.thread.start()
+
+    def prepare(self, level, size, screen):
+        order = self.levels.get_order(level)
+        board = Board(screen, (size, size), white_order=order[:-1], black_ball_loc=order[-1], color=colores['BLACK1'])
+        self.hints.prepare(*board.get_position())
+        with self.lock:
+            if self.key == (level, size, screen):
+                self.board = board
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def take(self, screen, size, level):
+        """
+        :return: the board of the level, waiting for it if it's still being built, or None if it wasn't requested
+                 for this level at this size (or building it failed)
+        """
+        if self.key != (level, size, screen):
+            return None
+        self.wait()
+        with self.lock:
+            board = self.board
+            self.key = None
+            self.board = None
+        return board
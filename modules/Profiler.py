@@ -0,0 +1,150 @@
+import csv
+import json
+import time
+from array import array
+
+from .colores import colores
+from .Fonts import fonts
+
+
+PHASES = ('events', 'logic', 'render', 'ui', 'flip')
+
+
+class FrameProfiler:
+    """
+    Times the phases of every frame into a ring buffer holding the last size frames.
+    A page loop calls start_frame, then mark(phase) at the end of each phase, and end_frame,
+    every call returns at once while the profiler is disabled.
+    """
+
+    def __init__(self, size=1024):
+        self.enabled = False
+        self.size = size
+        self.columns = len(PHASES) + 1  # the phases and the whole frame
+        self.buffer = array('d', [0.0]) * (size * self.columns)
+        self.index = 0  # the slot of the next frame
+        self.count = 0  # the number of frames in the buffer
+        self.total = 0  # the number of frames recorded since the start
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.current = [0.0] * len(PHASES)
+        self.overlay = None
+        self.overlay_frame = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:  # it may be turned on in the middle of a frame
+            self.start_frame()
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        for i in range(len(PHASES)):
+            self.current[i] = 0.0
+
+    def mark(self, phase):
+        """
+        Adds the time since the last mark to the phase
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[PHASES.index(phase)] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        offset = self.index * self.columns
+        self.buffer[offset:offset + len(PHASES)] = array('d', self.current)
+        self.buffer[offset + len(PHASES)] = time.perf_counter() - self.frame_start
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.total += 1
+
+    def get_frames(self):
+        """
+        :return: a list of the frames in the buffer from the oldest, each a list of the phase times and the frame time
+        """
+        start = (self.index - self.count) % self.size
+        frames = []
+        for i in range(self.count):
+            offset = (start + i) % self.size * self.columns
+            frames.append(list(self.buffer[offset:offset + self.columns]))
+        return frames
+
+    def percentile(self, fraction):
+        """
+        :return: the frame time at the fraction (0 to 1) of the sorted frame times in the buffer, in seconds
+        """
+        if not self.count:
+            return 0.0
+        times = sorted(frame[-1] for frame in self.get_frames())
+        return times[min(len(times) - 1, int(fraction * len(times)))]
+
+    def draw_overlay(self, screen):
+        """
+        Draws the frame time percentiles at the corner of the screen, refreshing them every 30 frames
+        :return: the rect of the overlay, or None if the profiler is disabled
+        """
+        if not self.enabled:
+            return None
+        if self.overlay is None or self.total - self.overlay_frame >= 30:
+            self.overlay_frame = self.total
+            text = f'p50 {self.percentile(0.5) * 1000:.2f} ms  p99 {self.percentile(0.99) * 1000:.2f} ms'
+            self.overlay = fonts.get_font('Arial', 16).render(text, True, colores['WHITE'], colores['BLACK'])
+        rect = self.overlay.get_rect(bottomright=screen.get_rect().bottomright)
+        screen.blit(self.overlay, rect)
+        return rect
+
+    def dump(self, path):
+        """
+        Writes the buffer to path, as JSON if it ends with .json, as CSV otherwise
+        """
+        columns = PHASES + ('frame',)
+        frames = self.get_frames()
+        with open(path, 'w', newline='') as file:
+            if path.endswith('.json'):
+                json.dump({'columns': columns, 'frames': frames}, file)
+            else:
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                writer.writerows(frames)
+
+    def dump_all(self, prefix='black_sheep_profile'):
+        """
+        Writes the buffer both as CSV and as JSON, to files named after the time
+        :return: the paths of the files
+        """
+        name = f'{prefix}_{time.strftime("%Y%m%d_%H%M%S")}'
+        paths = [f'{name}.csv', f'{name}.json']
+        for path in paths:
+            self.dump(path)
+        return paths
+
+
+class StartupReport:
+    """
+    Times the phases of the start of the game, from the creation of the report to the first frame of the first page
+    """
+
+    def __init__(self):
+        self.start = self.last_mark = time.perf_counter()
+        self.phases = []  # (phase, seconds) in the order they ended
+
+    def mark(self, phase):
+        """
+        Ends the phase, which started at the last mark
+        """
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last_mark))
+        self.last_mark = now
+
+    def get_total(self):
+        return self.last_mark - self.start
+
+    def print(self, file=None):
+        for phase, seconds in self.phases:
+            print(f'{phase:20} {seconds * 1000:9.2f} ms', file=file)
+        print(f'{"time to first frame":20} {self.get_total() * 1000:9.2f} ms', file=file)
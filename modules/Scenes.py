@@ -0,0 +1,30 @@
+class SceneManager:
+    """
+    Runs the pages of the game one after the other from a single loop.
+    A scene is a page function that runs its own loop until another scene is requested with switch, and then returns,
+    so the board, sprites and surfaces of the previous scene are released before the next one starts.
+    """
+
+    def __init__(self):
+        self.next_scene = None
+        self.current_scene = None
+
+    def switch(self, scene, *args):
+        """
+        Requests to leave the current scene for scene(*args)
+        """
+        self.next_scene = (scene, args)
+
+    def is_switching(self):
+        return self.next_scene is not None
+
+    def get_current_scene(self):
+        return self.current_scene
+
+    def run(self, scene, *args):
+        self.switch(scene, *args)
+        while self.next_scene is not None:
+            self.current_scene = self.next_scene
+            self.next_scene = None
+            scene, args = self.current_scene
+            scene(*args)
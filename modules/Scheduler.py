@@ -0,0 +1,61 @@
+import time
+
+import pygame
+
+
+class FrameScheduler:
+    """
+    Paces the loops of the pages.
+    While something is animating or the user is interacting, it ticks at the frame rate of the current scene,
+    once nothing happened for grace milliseconds it blocks on pygame.event.wait until input arrives,
+    waking up at least every idle_timeout milliseconds.
+    It keeps time with time.monotonic, since pygame's ticks read 0 until the clock first ticks
+    (the game doesn't start pygame's timer, see BlackSheep.__init__).
+    """
+
+    def __init__(self, clock, fps=60, grace=250, idle_timeout=1000):
+        self.clock = clock
+        self.fps = fps
+        self.grace = grace
+        self.idle_timeout = idle_timeout
+        self.awake_until = 0
+
+    def enter(self, fps):
+        """
+        Starts a scene at the given frame rate, awake
+        """
+        self.fps = fps
+        self.wake()
+
+    def wake(self):
+        self.awake_until = time.monotonic() + self.grace / 1000
+
+    def is_idle(self):
+        return time.monotonic() > self.awake_until
+
+    def get_events(self):
+        """
+        :return: the events of this frame, after waiting for one if the scene is idle
+        """
+        if self.is_idle():
+            event = pygame.event.wait(self.idle_timeout)
+            if event.type == pygame.NOEVENT:
+                return []
+            events = [event] + pygame.event.get()
+        else:
+            events = pygame.event.get()
+        if events:
+            self.wake()
+        return events
+
+    def tick(self, active=False):
+        """
+        Ends a frame
+        :param active: True if something is animating or being dragged, so the scene has to stay at full rate
+        """
+        if active:
+            self.wake()
+        if self.is_idle():
+            self.clock.tick()
+        else:
+            self.clock.tick(self.fps)
@@ -0,0 +1,217 @@
+"""
+Analytics over a directory of session logs.
+Per level it counts the times it was played, won, got stuck and left (including the sessions that ended in the middle of it),
+the sessions it was the last level of, the average time and number of moves, and the fatal moves,
+the moves that turned a position that could still be won into one that can't, which is what leads to "Stuck?".
+The logs are streamed: the files are listed lazily and handed in shards to a process pool, every worker replays its shard
+into partial aggregates, one file at a time, and the aggregates are merged as the shards are done.
+Usage: python -m modules.analytics [DIRECTORY] [--pack PACK] [--workers N] [--shard N] [--top N] [--csv | --json]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from .hints import HintOracle
+from .levelpack import load_pack, DEFAULT_PACK_PATH
+from .replay import SESSIONS_DIR, WON, STUCK, read_session, replay_headless
+from .retrograde import OutcomeTable
+from .rules import apply_move
+from .tables import print_table
+
+
+COLUMNS = ('level', 'plays', 'won', 'stuck', 'left', 'last_level_of', 'win_rate', 'quit_rate', 'avg_seconds',
+           'avg_moves', 'fatal_moves')
+
+_levels = None  # the level pack and the oracle of every worker process, opened with its first shard
+_oracle = None
+
+
+class LevelStats:
+    """
+    The aggregates of one level, partial ones are merged into the totals
+    """
+
+    def __init__(self):
+        self.plays = 0
+        self.won = 0
+        self.stuck = 0
+        self.left = 0
+        self.last_level_of = 0  # the number of sessions that ended with this level
+        self.milliseconds = 0
+        self.moves = 0
+        self.fatal_moves = Counter()  # (from, to) -> the number of times it made the level impossible to win
+
+    def merge(self, other):
+        self.plays += other.plays
+        self.won += other.won
+        self.stuck += other.stuck
+        self.left += other.left
+        self.last_level_of += other.last_level_of
+        self.milliseconds += other.milliseconds
+        self.moves += other.moves
+        self.fatal_moves.update(other.fatal_moves)
+
+    def to_row(self, level, top=3):
+        return {
+            'level': level,
+            'plays': self.plays,
+            'won': self.won,
+            'stuck': self.stuck,
+            'left': self.left,
+            'last_level_of': self.last_level_of,
+            'win_rate': self.won / self.plays if self.plays else 0.0,
+            'quit_rate': self.left / self.plays if self.plays else 0.0,
+            'avg_seconds': self.milliseconds / self.plays / 1000 if self.plays else 0.0,
+            'avg_moves': self.moves / self.plays if self.plays else 0.0,
+            'fatal_moves': ' '.join(f'{a}->{c}:{count}' for (a, c), count in self.fatal_moves.most_common(top)),
+        }
+
+
+class Aggregate:
+
+    def __init__(self):
+        self.levels = {}  # level -> LevelStats
+        self.files = 0
+        self.moves = 0
+        self.errors = 0  # levels whose log doesn't fit the rules or the pack, left out of the stats
+
+    def get_level(self, level):
+        stats = self.levels.get(level)
+        if stats is None:
+            stats = self.levels[level] = LevelStats()
+        return stats
+
+    def merge(self, other):
+        for level, stats in other.levels.items():
+            self.get_level(level).merge(stats)
+        self.files += other.files
+        self.moves += other.moves
+        self.errors += other.errors
+
+    def add_session(self, path, levels, oracle):
+        self.files += 1
+        last = None
+        for replay in replay_headless(read_session(path), levels):
+            last = replay.level
+            if replay.error is not None:
+                self.errors += 1
+                continue
+            stats = self.get_level(replay.level)
+            stats.plays += 1
+            if replay.outcome == WON:
+                stats.won += 1
+            elif replay.outcome == STUCK:
+                stats.stuck += 1
+            else:
+                stats.left += 1
+            stats.milliseconds += replay.get_duration()
+            stats.moves += len(replay.moves)
+            self.moves += len(replay.moves)
+
+            # the first move after which the level can't be won anymore, if the level could be won when it was made
+            mask, black = levels.get_position(replay.level)
+            if oracle.is_winnable(mask, black):
+                for move, _ in replay.moves:
+                    mask, black = apply_move(mask, black, move)
+                    if not oracle.is_winnable(mask, black):
+                        stats.fatal_moves[move[0], move[2]] += 1
+                        break
+        if last is not None and last in self.levels:
+            self.levels[last].last_level_of += 1
+
+
+def _analyze_shard(paths, pack_path):
+    global _levels, _oracle
+    if _levels is None:
+        _levels = load_pack(pack_path)
+        _oracle = HintOracle(OutcomeTable.load())
+    aggregate = Aggregate()
+    for path in paths:
+        try:
+            aggregate.add_session(path, _levels, _oracle)
+        except (OSError, ValueError):
+            aggregate.errors += 1
+    return aggregate
+
+
+def session_paths(directory):
+    """
+    Yields the paths of the session logs in the directory and its subdirectories, without listing them all first,
+    a directory that doesn't exist (no session was recorded yet) has none
+    """
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                yield from session_paths(entry.path)
+            elif entry.name.endswith('.bsr'):
+                yield entry.path
+
+
+def analyze(paths, pack_path=DEFAULT_PACK_PATH, workers=None, shard=64):
+    """
+    :param paths: an iterable of session log paths, consumed shard by shard
+    :return: the Aggregate of all the sessions
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = iter(paths)
+    total = Aggregate()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        while True:
+            # keep a couple of shards per worker in flight, so the paths are never all in memory
+            while len(pending) < workers * 2:
+                paths_shard = list(islice(paths, shard))
+                if not paths_shard:
+                    break
+                pending.add(executor.submit(_analyze_shard, paths_shard, pack_path))
+            if not pending:
+                return total
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                total.merge(future.result())
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.analytics', description='Compute per level statistics of session logs.')
+    parser.add_argument('directory', nargs='?', default=SESSIONS_DIR)
+    parser.add_argument('--pack', default=DEFAULT_PACK_PATH, help='the level pack the sessions were played with')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--shard', type=int, default=64, help='session files per task')
+    parser.add_argument('--top', type=int, default=3, help='fatal moves listed per level')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--csv', action='store_true', help='print CSV instead of a table')
+    output.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    options = parser.parse_args(args)
+
+    start = time.perf_counter()
+    total = analyze(session_paths(options.directory), options.pack, options.workers, options.shard)
+    seconds = time.perf_counter() - start
+    rows = [total.levels[level].to_row(level, options.top) for level in sorted(total.levels)]
+    if options.csv:
+        writer = csv.DictWriter(sys.stdout, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    elif options.json:
+        print(json.dumps({'files': total.files, 'moves': total.moves, 'errors': total.errors, 'levels': rows}))
+    else:
+        if rows:
+            print_table(rows, COLUMNS)
+            # left counts the sessions that ended in the middle of a level too, so last_level_of isn't added to it
+            quit_level = max(rows, key=lambda row: (row['left'], row['quit_rate']))
+            print(f'most quit level: {quit_level["level"]}, left {quit_level["left"]} times')
+        print(f'{total.files} sessions, {total.moves} moves ({total.errors} bad levels) analyzed in {seconds:.2f} s', file=sys.stderr)
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -3,6 +3,7 @@ colores = {
     'WHITE': (255, 255, 255),
     'RED': (255, 0, 0),
     'BLUE': (0, 0, 255),
+    'GREEN': (0, 200, 0),
     'LIGHT_BLUE1': (230, 230, 255),
     'LIGHT_BLUE2': (173, 180, 255),
     'BLACK1': (50, 50, 50),
@@ -0,0 +1,118 @@
+"""
+Difficulty analytics of levels.
+For every level it computes, over the tree of all the move series from its start:
+the number of winning lines and of all lines, the average and maximum number of legal moves (branching),
+the fraction of the choices made from winnable positions that lead to positions that can't be won (dead ends),
+and the minimum number of moves to win.
+The counts are memoized per canonical position, so positions shared by lines or by levels are counted once.
+Usage: python -m modules.difficulty [--levels FILE] [--sort COLUMN] [--reverse] [--csv]
+FILE is a file of levels printed by modules.generator, without it the levels in orders are analyzed.
+"""
+import argparse
+import csv
+import sys
+import time
+
+from .generator import read_levels
+from .orders import orders
+from .rules import make_position, legal_moves, apply_move, count_balls, is_win
+from .symmetry import canonical_key
+from .tables import print_table
+
+
+COLUMNS = ('level', 'balls', 'black', 'winning_lines', 'lines', 'win_ratio', 'avg_branching', 'max_branching',
+           'dead_end_ratio', 'min_depth')
+
+_NO_WIN = 99  # the min_depth of positions that can't be won
+
+
+class DifficultyAnalyzer:
+
+    def __init__(self):
+        self.table = {}  # canonical key -> the counts of the tree from the position
+
+    def counts(self, mask, black):
+        """
+        :return: (winning lines, lines, positions with moves, moves, max moves, mistakes, choices, min depth)
+                 of the tree of move series from the position
+        """
+        key = canonical_key(mask, black)
+        counts = self.table.get(key)
+        if counts is not None:
+            return counts
+        moves = legal_moves(mask, black)
+        if not moves:
+            won = is_win(mask)
+            counts = (1 if won else 0, 1, 0, 0, 0, 0, 0, 0 if won else _NO_WIN)
+        else:
+            children = [self.counts(*apply_move(mask, black, move)) for move in moves]
+            winning_lines = sum(child[0] for child in children)
+            winning_children = [child for child in children if child[0]]
+            mistakes = choices = 0
+            if winning_lines:  # only the choices made while the position can still be won count as mistakes
+                mistakes = len(children) - len(winning_children) + sum(child[5] for child in winning_children)
+                choices = len(children) + sum(child[6] for child in winning_children)
+            counts = (
+                winning_lines,
+                sum(child[1] for child in children),
+                1 + sum(child[2] for child in children),
+                len(moves) + sum(child[3] for child in children),
+                max(len(moves), max(child[4] for child in children)),
+                mistakes,
+                choices,
+                min(_NO_WIN, 1 + min(child[7] for child in children)),
+            )
+        self.table[key] = counts
+        return counts
+
+    def analyze(self, level, mask, black):
+        """
+        :return: a dictionary of the metrics of the level, with the keys in COLUMNS
+        """
+        winning_lines, lines, positions, moves, max_moves, mistakes, choices, min_depth = self.counts(mask, black)
+        return {
+            'level': level,
+            'balls': count_balls(mask),
+            'black': black is not None,
+            'winning_lines': winning_lines,
+            'lines': lines,
+            'win_ratio': winning_lines / lines,
+            'avg_branching': moves / positions if positions else 0.0,
+            'max_branching': max_moves,
+            'dead_end_ratio': mistakes / choices if choices else 0.0,
+            'min_depth': min_depth if min_depth < _NO_WIN else None,
+        }
+
+    def analyze_levels(self, levels):
+        """
+        :param levels: a list of levels in the format of orders
+        :return: a list of the metrics of the levels, numbered from 1
+        """
+        return [self.analyze(number, *make_position(order[:-1], order[-1])) for number, order in enumerate(levels, start=1)]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.difficulty', description='Compute difficulty metrics of levels.')
+    parser.add_argument('--levels', default=None, help='a file of generated levels, one JSON level per line')
+    parser.add_argument('--sort', choices=COLUMNS, default='level', help='the column to sort by')
+    parser.add_argument('--reverse', action='store_true', help='sort in descending order')
+    parser.add_argument('--csv', action='store_true', help='print CSV instead of a table')
+    options = parser.parse_args(args)
+
+    levels = list(read_levels(options.levels)) if options.levels else orders
+    start = time.perf_counter()
+    rows = DifficultyAnalyzer().analyze_levels(levels)
+    seconds = time.perf_counter() - start
+    rows.sort(key=lambda row: (row[options.sort] is None, row[options.sort]), reverse=options.reverse)
+    if options.csv:
+        writer = csv.DictWriter(sys.stdout, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print_table(rows, COLUMNS)
+        print(f'{len(rows)} levels analyzed in {seconds:.2f} s', file=sys.stderr)
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Procedural level generator.
+Levels are made backwards: starting from a single ball, moves are undone at random until the board holds
+the wanted number of balls, so every level comes with a solution (the undone moves replayed forwards).
+Levels are deduplicated by their canonical form, so no two of them are the same puzzle rotated or mirrored.
+Usage: python -m modules.generator COUNT [--balls N] [--black | --no-black] [--workers N] [--seed N]
+prints one JSON level per line.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from .rules import HOLES, JUMPS, make_order, legal_moves, apply_move, count_balls
+from .solver import Solver
+from .symmetry import canonical_key
+
+
+_solver = None  # one solver per worker process, shared by the levels it scores
+
+
+class GeneratedLevel:
+
+    def __init__(self, mask, black, solution, difficulty):
+        self.mask = mask
+        self.black = black
+        self.solution = solution  # the winning list of (from, over, to) moves
+        self.difficulty = difficulty
+
+    def order(self):
+        """
+        :return: the level in the format of orders, the white balls followed by the black ball (None if there's none)
+        """
+        return make_order(self.mask, self.black)
+
+    def to_dict(self):
+        return {
+            'order': self.order(),
+            'solution': [[a, c] for a, b, c in self.solution],
+            'difficulty': round(self.difficulty, 3),
+        }
+
+
+def read_levels(path):
+    """
+    Reads a file of levels as main prints them, one JSON level per line
+    :return: an iterator of the levels in the format of orders
+    """
+    with open(path) as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)['order']
+
+
+def unmoves(mask):
+    """
+    :return: a list of the moves that could have led to the position
+    """
+    return [(a, b, c) for a, b, c in JUMPS if mask >> c & 1 and not mask >> a & 1 and not mask >> b & 1]
+
+
+def unapply_move(mask, black, move):
+    """
+    Undoes a move, the ball at its end goes back to its start and the bypassed hole gets a white ball
+    :return: the previous (mask, black)
+    """
+    a, b, c = move
+    return mask ^ ((1 << a) | (1 << b) | (1 << c)), a if c == black else black
+
+
+def difficulty_score(mask, black, solution, solver):
+    """
+    :return: the number of bits of guessing needed to follow the solution, at each step the log of
+             the number of legal moves over the number of moves that keep the position winnable
+    """
+    score = 0.0
+    for move in solution:
+        moves = legal_moves(mask, black)
+        winning = sum(1 for option in moves if solver.winnable(*apply_move(mask, black, option)))
+        score += math.log2(len(moves) / winning)
+        mask, black = apply_move(mask, black, move)
+    return score
+
+
+def generate(balls=None, black=None, seed=None, min_balls=4, max_balls=HOLES, solver=None, max_failures=1000):
+    """
+    Yields new levels, lazily, until max_failures levels in a row are duplicates or dead ends
+    :param balls: the number of balls of every level, or None for a random number from min_balls to max_balls
+    :param black: True for levels with a black ball, False for levels without, None to pick at random
+    """
+    rng = random.Random(seed)
+    solver = solver or Solver()
+    seen = set()
+    failures = 0
+    while failures < max_failures:
+        target = balls or rng.randint(min_balls, max_balls)
+        end = rng.randrange(HOLES)
+        with_black = black if black is not None else rng.random() < 0.5
+        mask, black_ball = 1 << end, end if with_black else None  # a black ball is always the one left
+        undone = []
+        while count_balls(mask) < target:
+            options = unmoves(mask)
+            if not options:
+                break
+            move = rng.choice(options)
+            mask, black_ball = unapply_move(mask, black_ball, move)
+            undone.append(move)
+        key = canonical_key(mask, black_ball)
+        if count_balls(mask) < target or key in seen:
+            failures += 1
+            continue
+        failures = 0
+        seen.add(key)
+        solution = undone[::-1]
+        yield GeneratedLevel(mask, black_ball, solution, difficulty_score(mask, black_ball, solution, solver))
+
+
+def _generate_chunk(count, seed, options):
+    global _solver
+    if _solver is None:
+        _solver = Solver()
+    return list(islice(generate(seed=seed, solver=_solver, **options), count))
+
+
+def generate_pack(count, workers=None, seed=0, chunk=256, max_empty_rounds=3, **options):
+    """
+    Yields count new levels, generated in chunks by a process pool, as the chunks are done.
+    Every round gives each worker a whole chunk with a seed of its own, since late in a pack most of a chunk
+    repeats levels other chunks made, and the pack ends only after max_empty_rounds rounds in a row add nothing.
+    Raises ValueError, after yielding the levels it made, if there are fewer than count levels with these options
+    :param options: passed to generate
+    """
+    workers = workers or os.cpu_count() or 1
+    seen = set()
+    produced = 0
+    next_seed = seed
+    empty_rounds = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while produced < count:
+            chunks = max(workers, min(math.ceil((count - produced) / chunk), workers * 2))
+            futures = [executor.submit(_generate_chunk, chunk, next_seed + number, options) for number in range(chunks)]
+            next_seed += chunks
+            added = 0
+            for future in as_completed(futures):
+                for level in future.result():
+                    key = canonical_key(level.mask, level.black)
+                    if key in seen or produced >= count:
+                        continue
+                    seen.add(key)
+                    produced += 1
+                    added += 1
+                    yield level
+            empty_rounds = 0 if added else empty_rounds + 1
+            if empty_rounds == max_empty_rounds:
+                raise ValueError(f'only {produced} different levels could be made with these options, not {count}')
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.generator', description='Generate solvable levels.')
+    parser.add_argument('count', type=int, help='number of levels to generate')
+    parser.add_argument('--balls', type=int, default=None, help='number of balls in every level')
+    parser.add_argument('--black', dest='black', action='store_true', default=None, help='only levels with a black ball')
+    parser.add_argument('--no-black', dest='black', action='store_false', help='only levels without a black ball')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(args)
+
+    try:
+        for level in generate_pack(options.count, options.workers, options.seed, balls=options.balls, black=options.black):
+            print(json.dumps(level.to_dict()))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
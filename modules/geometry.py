@@ -0,0 +1,347 @@
+"""
+Board geometries, and the rules engine for a board of any geometry.
+A geometry is the list of its hole locations, in units of half the distance between two neighbouring holes.
+The jump table is derived from the locations: either every triple of holes that are contiguous and in one line,
+or, if the geometry gives its directions, every triple of holes a direction step apart.
+Its symmetries are the permutations of the holes that map the board onto itself.
+Positions are (mask, black) as in modules.rules, the masks being integers as wide as the board has holes.
+Usage: python -m modules.geometry [NAME ...]
+prints the presets and solves the game on each, starting from the full board without the middle hole.
+"""
+import sys
+import time
+from itertools import permutations as orderings
+
+
+def derive_jumps(points, directions=None):
+    """
+    :param directions: the (dx, dy) steps a ball jumps over, None to allow any contiguous line
+    :return: a tuple of all the (from, over, to) triples of holes a ball can jump along
+    """
+    index = {point: number for number, point in enumerate(points)}
+    jumps = []
+    for start, (x1, y1) in enumerate(points):
+        if directions is not None:
+            for dx, dy in directions:
+                over, end = index.get((x1 + dx, y1 + dy)), index.get((x1 + 2 * dx, y1 + 2 * dy))
+                if over is not None and end is not None:
+                    jumps.append((start, over, end))
+            continue
+        for over, (x2, y2) in enumerate(points):
+            if start == over:
+                continue
+            dx, dy = x2 - x1, y2 - y1
+            end = index.get((x2 + dx, y2 + dy))
+            if end is None:
+                continue
+            # a hole lying between two others on the line means they are not contiguous
+            step = _gcd(abs(dx), abs(dy))
+            between = [(x1 + dx * k // step, y1 + dy * k // step) for k in range(1, 2 * step) if k != step]
+            if not any(point in index for point in between):
+                jumps.append((start, over, end))
+    return tuple(jumps)
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def derive_permutations(points):
+    """
+    :return: a tuple of the permutations of the holes under the symmetries of the square holding the points
+             that map the points onto themselves, the identity first
+    """
+    size_x = max(x for x, y in points) + min(x for x, y in points)
+    size_y = max(y for x, y in points) + min(y for x, y in points)
+    transforms = [
+        lambda x, y: (x, y),
+        lambda x, y: (size_x - x, size_y - y),
+        lambda x, y: (size_x - x, y),
+        lambda x, y: (x, size_y - y),
+    ]
+    if size_x == size_y:  # the quarter turns and the diagonal reflections only fit a square
+        transforms += [
+            lambda x, y: (size_x - y, x),
+            lambda x, y: (y, size_x - x),
+            lambda x, y: (y, x),
+            lambda x, y: (size_x - y, size_x - x),
+        ]
+    index = {point: number for number, point in enumerate(points)}
+    permutations = []
+    for transform in transforms:
+        permutation = tuple(index.get(transform(*point)) for point in points)
+        if None not in permutation and permutation not in permutations:
+            permutations.append(permutation)
+    return tuple(permutations)
+
+
+def lattice_points(size):
+    """
+    :return: the points of a size x size lattice of holes with a hole in the center of every square of it,
+             the classic board is the lattice of size 3
+    """
+    extent = 2 * (size - 1)
+    return tuple((x, y) for y in range(extent + 1) for x in range(y % 2, extent + 1, 2))
+
+
+def cross_points(arm=2, width=3):
+    """
+    :return: the points of a cross shaped board, arm holes long and width holes wide around a width x width square,
+             the English board has arms of 2 holes and is 3 holes wide
+    """
+    side = 2 * arm + width
+    low, high = arm, arm + width
+    return tuple((2 * x, 2 * y) for y in range(side) for x in range(side) if low <= x < high or low <= y < high)
+
+
+def triangle_points(rows):
+    """
+    :return: the points of a triangular board, row r holding r + 1 holes
+    """
+    return tuple((rows - 1 - row + 2 * i, 2 * row) for row in range(rows) for i in range(row + 1))
+
+
+def triangle_permutations(rows):
+    """
+    :return: the permutations of the holes of a triangular board under its 6 symmetries
+    """
+    # a hole is (a, b, c) = (i, row - i, rows - 1 - row), and the symmetries permute a, b and c
+    holes = [(i, row - i, rows - 1 - row) for row in range(rows) for i in range(row + 1)]
+    index = {hole: number for number, hole in enumerate(holes)}
+    return tuple(tuple(index[tuple(hole[k] for k in order)] for hole in holes) for order in orderings(range(3)))
+
+
+LATTICE_DIRECTIONS = ((2, 0), (-2, 0), (0, 2), (0, -2), (1, 1), (-1, -1), (1, -1), (-1, 1))
+ORTHOGONAL_DIRECTIONS = ((2, 0), (-2, 0), (0, 2), (0, -2))
+TRIANGLE_DIRECTIONS = ((2, 0), (-2, 0), (1, 2), (-1, -2), (-1, 2), (1, -2))
+
+def _null_space(rows, width):
+    """
+    :param rows: bit masks of width bits, the rows of a matrix over GF(2)
+    :return: a basis of the bit masks whose intersection with every row has an even number of bits
+    """
+    pivots = {}  # pivot bit -> the reduced row having it
+    for row in rows:
+        for bit, pivot_row in pivots.items():
+            if row >> bit & 1:
+                row ^= pivot_row
+        if row:
+            bit = row.bit_length() - 1
+            for other in list(pivots):
+                if pivots[other] >> bit & 1:
+                    pivots[other] ^= row
+            pivots[bit] = row
+    basis = []
+    for free in range(width):
+        if free in pivots:
+            continue
+        vector = 1 << free
+        for bit, row in pivots.items():
+            if row >> free & 1:
+                vector |= 1 << bit
+        basis.append(vector)
+    return tuple(basis)
+
+
+_CHUNK = 8  # the bits of a mask mapped by one lookup, when mapping masks under the symmetries
+
+
+class Geometry:
+
+    def __init__(self, name, points, directions=None, permutations=None):
+        """
+        :param points: the hole locations, the hole numbers are their indexes
+        :param directions: the steps balls jump along, see derive_jumps
+        :param permutations: the symmetries of the board, derived from the square holding the points if not given
+        """
+        self.name = name
+        self.points = tuple(points)
+        self.holes = len(self.points)
+        self.full_mask = (1 << self.holes) - 1
+        self.jumps = derive_jumps(self.points, directions)
+        # the jumps starting at each hole, and the jumps whose legality depends on each hole, indexed by hole number
+        self.jumps_from = tuple(tuple(jump for jump in self.jumps if jump[0] == number) for number in range(self.holes))
+        self.jumps_touching = tuple(tuple(jump for jump in self.jumps if number in jump) for number in range(self.holes))
+        # (from, over, to, mask of from and over, mask of to) per jump, for fast legality checks
+        self.jump_masks = tuple((a, b, c, (1 << a) | (1 << b), 1 << c) for a, b, c in self.jumps)
+
+        self.permutations = permutations if permutations is not None else derive_permutations(self.points)
+        jumps = set(self.jumps)
+        assert all({tuple(permutation[number] for number in jump) for jump in jumps} == jumps
+                   for permutation in self.permutations), f'a symmetry of {name} does not keep its jumps'
+        # the position classes: a move flips the parity of the balls on any set of holes that holds 0 or 2 holes of
+        # every jump, so the parities on a basis of those sets can't change, and a position whose parities are not
+        # those of any single hole can never be won
+        self.class_sets = _null_space([(1 << a) | (1 << b) | (1 << c) for a, b, c in self.jumps], self.holes)
+        self.winning_classes = frozenset(self.get_class(1 << number) for number in range(self.holes))
+        # the image of every chunk of bits of a mask under every symmetry, so a mask is mapped a chunk per lookup
+        self.chunk_tables = tuple(
+            tuple(tuple(sum(1 << permutation[shift + bit] for bit in range(min(_CHUNK, self.holes - shift)) if chunk >> bit & 1)
+                        for chunk in range(1 << min(_CHUNK, self.holes - shift)))
+                  for shift in range(0, self.holes, _CHUNK))
+            for permutation in self.permutations)
+        self.shifts = tuple(range(0, self.holes, _CHUNK))
+        # the key bits of the black ball's image under every symmetry, indexed by its hole, or by holes if there's none
+        self.black_keys = tuple(tuple(permutation[number] << self.holes for number in range(self.holes)) + (self.holes << self.holes,)
+                                for permutation in self.permutations)
+        self.key_tables = tuple(zip(self.chunk_tables, self.black_keys))
+
+    def __repr__(self):
+        return f'Geometry({self.name!r}, {self.holes} holes, {len(self.jumps)} jumps, {len(self.permutations)} symmetries)'
+
+    def get_extent(self):
+        """
+        :return: the (width, height) of the board, in half distances
+        """
+        return max(x for x, y in self.points), max(y for x, y in self.points)
+
+    def make_position(self, white_order, black_ball_loc=None):
+        """
+        Builds a position from a level order, holes that don't exist on the board are ignored
+        :return: (mask, black)
+        """
+        mask = 0
+        for number in white_order:
+            if 0 <= number < self.holes:
+                mask |= 1 << number
+        black = black_ball_loc if black_ball_loc is not None and 0 <= black_ball_loc < self.holes else None
+        if black is not None:
+            mask |= 1 << black
+        return mask, black
+
+    def make_order(self, mask, black):
+        """
+        The inverse of make_position
+        :return: the position in the format of a level order, the white balls followed by the black ball (None if there's none)
+        """
+        return [number for number in self.holes_of(mask) if number != black] + [black]
+
+    def position_key(self, mask, black):
+        """
+        :return: the position packed in one integer, the mask in the low bits and the black ball's hole above them
+        """
+        return mask | (self.holes if black is None else black) << self.holes
+
+    def is_legal(self, mask, black, move):
+        a, b, c = move
+        return bool(mask >> a & 1 and mask >> b & 1 and not mask >> c & 1) and b != black
+
+    def legal_moves(self, mask, black=None):
+        """
+        :return: a list of all the moves that can be made at the position
+        """
+        return [(a, b, c) for a, b, c, need, target in self.jump_masks
+                if mask & need == need and not mask & target and b != black]
+
+    def has_moves(self, mask, black=None):
+        for a, b, c, need, target in self.jump_masks:
+            if mask & need == need and not mask & target and b != black:
+                return True
+        return False
+
+    @staticmethod
+    def apply_move(mask, black, move):
+        """
+        Makes a move, the move is assumed to be legal
+        :return: the new (mask, black)
+        """
+        a, b, c = move
+        return mask ^ ((1 << a) | (1 << b) | (1 << c)), c if a == black else black
+
+    def find_move(self, mask, black, start, end):
+        """
+        :return: the legal move from start to end, or None if there isn't one
+        """
+        for a, b, c, need, target in self.jump_masks:
+            if a == start and c == end and mask & need == need and not mask & target and b != black:
+                return a, b, c
+        return None
+
+    @staticmethod
+    def count_balls(mask):
+        return bin(mask).count('1')
+
+    @staticmethod
+    def is_win(mask):
+        return mask != 0 and mask & (mask - 1) == 0
+
+    def holes_of(self, mask):
+        """
+        :return: a list of the occupied hole numbers
+        """
+        return [number for number in range(self.holes) if mask >> number & 1]
+
+    def transform(self, mask, black, symmetry):
+        """
+        :param symmetry: the index of the symmetry in self.permutations
+        :return: the image (mask, black) of the position
+        """
+        image = 0
+        for shift, table in zip(self.shifts, self.chunk_tables[symmetry]):
+            image |= table[mask >> shift & 0xFF]
+        return image, self.permutations[symmetry][black] if black is not None else None
+
+    def canonical_key(self, mask, black):
+        """
+        :return: the smallest key of the position under the symmetries, the same for all the positions equivalent to it
+        """
+        chunks = [mask >> shift & 0xFF for shift in self.shifts]  # split once for all the symmetries
+        black = self.holes if black is None else black
+        best = None
+        for tables, black_keys in self.key_tables:
+            key = black_keys[black]
+            for chunk, table in zip(chunks, tables):
+                key |= table[chunk]
+            if best is None or key < best:
+                best = key
+        return best
+
+    def get_class(self, mask):
+        """
+        :return: the position class of the mask, which no move changes
+        """
+        position_class = 0
+        for bit, holes in enumerate(self.class_sets):
+            position_class |= (bin(mask & holes).count('1') & 1) << bit
+        return position_class
+
+    def could_win(self, mask):
+        """
+        :return: False if the position can't be won because of its class, True if it may be won
+        """
+        return self.get_class(mask) in self.winning_classes
+
+    def get_center(self):
+        """
+        :return: the hole nearest to the middle of the board
+        """
+        width, height = self.get_extent()
+        return min(range(self.holes), key=lambda number: abs(2 * self.points[number][0] - width) + abs(2 * self.points[number][1] - height))
+
+
+CLASSIC = Geometry('classic', lattice_points(3))  # the board of the game
+LATTICE = Geometry('lattice', lattice_points(4), LATTICE_DIRECTIONS)
+ENGLISH = Geometry('english', cross_points(), ORTHOGONAL_DIRECTIONS)
+TRIANGLE = Geometry('triangle', triangle_points(5), TRIANGLE_DIRECTIONS, triangle_permutations(5))
+
+GEOMETRIES = {geometry.name: geometry for geometry in (CLASSIC, LATTICE, ENGLISH, TRIANGLE)}
+
+
+def main(args):
+    from .solver import Solver
+
+    for name in args or GEOMETRIES:
+        geometry = GEOMETRIES[name]
+        center = geometry.get_center()
+        mask = geometry.full_mask & ~(1 << center)
+        solver = Solver(geometry=geometry)
+        start = time.perf_counter()
+        solution = solver.solve(mask, None)
+        moves = ' '.join(f'{a}->{c}' for a, b, c in solution.moves) if solution.is_solvable() else 'unsolvable'
+        print(f'{geometry}: without hole {center}: {moves} ({solution.nodes} nodes, {time.perf_counter() - start:.2f} s)')
+
+
+if "__main__" == __name__:
+    main(sys.argv[1:])
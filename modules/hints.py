@@ -0,0 +1,35 @@
+"""
+Answers whether a position can still be won and which move keeps it winnable, without searching while a level is played.
+The answers come from the outcomes table if it's there, otherwise from a solver that explores every position
+reachable from the level's start when the level is loaded.
+"""
+from .rules import legal_moves, apply_move
+from .solver import Solver
+
+
+class HintOracle:
+
+    def __init__(self, outcomes=None, solver=None):
+        self.outcomes = outcomes
+        self.solver = solver if solver is not None or outcomes is not None else Solver()
+
+    def prepare(self, mask, black):
+        """
+        Makes sure every position reachable from the position can be looked up, call it when a level is loaded
+        """
+        if self.outcomes is None:
+            self.solver.explore(mask, black)
+
+    def is_winnable(self, mask, black):
+        if self.outcomes is not None:
+            return self.outcomes.is_winnable(mask, black)
+        return self.solver.winnable(mask, black)
+
+    def winning_move(self, mask, black):
+        """
+        :return: a (from, over, to) move after which the position can still be won, or None if there isn't one
+        """
+        for move in legal_moves(mask, black):
+            if self.is_winnable(*apply_move(mask, black, move)):
+                return move
+        return None
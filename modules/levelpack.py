@@ -0,0 +1,174 @@
+"""
+Level packs, files of levels read through mmap.
+A pack starts with a header (magic, version, number of holes, number of levels), followed by one fixed width
+record per level: the 13 bit mask of the occupied holes as 2 bytes, and the black ball's hole as 1 byte (NO_BLACK if none).
+Level N is read from a fixed offset, so opening and reading a level doesn't depend on the size of the pack.
+Usage: python -m modules.levelpack build PACK [--levels FILE] [--force]
+       python -m modules.levelpack info PACK
+FILE is a file of levels printed by modules.generator, without it the pack holds the levels in orders.
+Every level is checked before the pack is written, and no pack is written if any level is malformed,
+unless --force is given, which writes them as the game plays them, without the holes that don't exist.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+from .generator import read_levels
+from .orders import orders
+from .rules import HOLES, make_position, make_order
+from .validate import check_level
+
+
+DEFAULT_PACK_PATH = os.path.join(Path(__file__).parent.parent, 'assets', 'levels', 'default.pack')
+
+NO_BLACK = 0xFF
+
+_MAGIC = b'BSLP'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHI')  # magic, version, holes, levels
+_RECORD = struct.Struct('<HB')  # mask, black
+
+
+class LevelPack:
+    """
+    A pack file mapped to memory, the levels are numbered from 1 as in the game
+    """
+
+    def __init__(self, path=DEFAULT_PACK_PATH):
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, holes, self.count = _HEADER.unpack_from(self.data)
+        if magic != _MAGIC or version != _VERSION or holes != HOLES:
+            self.data.close()
+            raise ValueError(f'{path} is not a level pack of this board')
+        if len(self.data) < _HEADER.size + self.count * _RECORD.size:
+            self.data.close()
+            raise ValueError(f'{path} is truncated')
+
+    def __len__(self):
+        return self.count
+
+    def get_position(self, level):
+        """
+        :return: the (mask, black) of the level
+        """
+        if not 0 < level <= self.count:
+            raise IndexError(f'level {level} is not in the pack')
+        mask, black = _RECORD.unpack_from(self.data, _HEADER.size + (level - 1) * _RECORD.size)
+        return mask, None if black == NO_BLACK else black
+
+    def get_order(self, level):
+        """
+        :return: the level in the format of orders, the white balls followed by the black ball (None if there's none)
+        """
+        return make_order(*self.get_position(level))
+
+    def close(self):
+        self.data.close()
+
+
+class OrdersPack:
+    """
+    The levels in orders, with the interface of LevelPack, for when there's no pack file
+    """
+
+    def __init__(self, levels=orders):
+        self.levels = levels
+
+    def __len__(self):
+        return len(self.levels)
+
+    def get_position(self, level):
+        if not 0 < level <= len(self.levels):
+            raise IndexError(f'level {level} is not in the pack')
+        order = self.levels[level - 1]
+        return make_position(order[:-1], order[-1])
+
+    def get_order(self, level):
+        return make_order(*self.get_position(level))
+
+    def close(self):
+        pass
+
+
+def load_pack(path=DEFAULT_PACK_PATH):
+    """
+    :return: the pack at path, or the levels in orders if there's no valid pack there
+    """
+    try:
+        return LevelPack(path)
+    except (OSError, ValueError):
+        return OrdersPack()
+
+
+def write_pack(path, positions):
+    """
+    Writes the levels to a pack file, streaming them so a pack of any size can be written
+    :param positions: an iterable of (mask, black) positions
+    :return: the number of levels written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    count = 0
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, HOLES, 0))
+        for mask, black in positions:
+            file.write(_RECORD.pack(mask, NO_BLACK if black is None else black))
+            count += 1
+        file.seek(0)
+        file.write(_HEADER.pack(_MAGIC, _VERSION, HOLES, count))
+    return count
+
+
+def read_orders(path=None):
+    """
+    :return: an iterator of the levels of the file at path, or of the levels in orders if path is None
+    """
+    return read_levels(path) if path else iter(orders)
+
+
+def is_playable(order):
+    """
+    :return: True if the level can be turned into a position, even if some of its holes don't exist
+    """
+    return bool(order) and all(number is None or isinstance(number, int) for number in order)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.levelpack', description='Build and inspect level packs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='write a level pack')
+    build.add_argument('pack')
+    build.add_argument('--levels', default=None, help='a file of generated levels, one JSON level per line')
+    build.add_argument('--force', action='store_true', help='write malformed levels without the holes that don\'t exist')
+    info = commands.add_parser('info', help='print the levels of a pack')
+    info.add_argument('pack')
+    options = parser.parse_args(args)
+
+    if options.command == 'build':
+        # the levels are read twice, to check all of them before anything is written
+        malformed = refused = 0
+        for number, order in enumerate(read_orders(options.levels), start=1):
+            errors = check_level(order)
+            if errors:
+                malformed += 1
+                refused += not options.force or not is_playable(order)
+                print(f'level {number}: {", ".join(errors)}', file=sys.stderr)
+        if refused:
+            print(f'{malformed} malformed levels, no pack written (--force writes the ones the game can play)', file=sys.stderr)
+            return 1
+        positions = (make_position(order[:-1], order[-1]) for order in read_orders(options.levels))
+        print(f'{write_pack(options.pack, positions)} levels written to {options.pack}')
+    else:
+        pack = LevelPack(options.pack)
+        print(f'{len(pack)} levels')
+        for level in range(1, len(pack) + 1):
+            print(level, pack.get_order(level))
+        pack.close()
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Session logs, and their replay.
+A session log is an append-only binary file: a header (magic, version, the start time of the session),
+followed by records, each starting with a byte:
+    a move is that byte alone, holding the hole it's from in its high 4 bits and the hole it's to in the low 4 bits,
+    LEVEL_START is followed by the level number, LEVEL_END by the outcome (WON, STUCK or LEFT),
+and every record ends with the milliseconds passed since the previous record.
+Numbers are written as unsigned LEB128 varints, so a move usually takes 3 bytes.
+Usage: python -m modules.replay SESSION [--visual] [--pack PACK]
+replays the session headless and prints what happened, or shows it on screen at real speed with --visual.
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from .levelpack import load_pack, DEFAULT_PACK_PATH
+from .rules import find_move, apply_move, is_win, has_moves
+
+
+SESSIONS_DIR = os.path.join(Path(__file__).parent.parent, 'sessions')
+
+LEVEL_START = 0xF0
+LEVEL_END = 0xF1
+
+WON = 0
+STUCK = 1
+LEFT = 2
+OUTCOMES = {WON: 'won', STUCK: 'stuck', LEFT: 'left'}
+
+_MAGIC = b'BSRL'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBd')  # magic, version, start time in seconds since the epoch
+
+
+def _varint(number):
+    data = bytearray()
+    while True:
+        byte = number & 0x7F
+        number >>= 7
+        if number:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+class SessionRecorder:
+    """
+    Appends the levels played and the moves made in a session to a log file, opened with the first level
+    """
+
+    def __init__(self, directory=SESSIONS_DIR):
+        self.directory = directory
+        self.file = None
+        self.last_time = None
+        self.level_open = False
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        now = time.time()
+        name = f'session_{time.strftime("%Y%m%d_%H%M%S", time.localtime(now))}_{os.getpid()}.bsr'
+        self.file = open(os.path.join(self.directory, name), 'ab')
+        self.file.write(_HEADER.pack(_MAGIC, _VERSION, now))
+        self.last_time = time.monotonic()
+
+    def write(self, data):
+        now = time.monotonic()
+        delta = int((now - self.last_time) * 1000)
+        self.last_time += delta / 1000
+        self.file.write(data + _varint(delta))
+        self.file.flush()
+
+    def start_level(self, level):
+        if self.file is None:
+            self.open()
+        if self.level_open:
+            self.end_level(LEFT)
+        self.write(bytes([LEVEL_START]) + _varint(level))
+        self.level_open = True
+
+    def record_move(self, start, end):
+        self.write(bytes([start << 4 | end]))
+
+    def end_level(self, outcome):
+        if self.level_open:
+            self.write(bytes([LEVEL_END, outcome]))
+            self.level_open = False
+
+    def close(self):
+        if self.file is not None:
+            self.end_level(LEFT)
+            self.file.close()
+            self.file = None
+
+
+class Record:
+
+    def __init__(self, kind, time, level=None, move=None, outcome=None):
+        self.kind = kind  # LEVEL_START, LEVEL_END or None for a move
+        self.time = time  # milliseconds since the start of the session
+        self.level = level
+        self.move = move  # a (from, to) tuple
+        self.outcome = outcome
+
+
+def read_session(path):
+    """
+    Yields the records of a session log, a truncated last record is ignored
+    :return: the start time of the session
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, started = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f'{path} is not a session log')
+
+    position = _HEADER.size
+
+    def varint():
+        nonlocal position
+        number = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            number |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return number
+
+    elapsed = 0
+    while position < len(data):
+        try:
+            tag = data[position]
+            position += 1
+            if tag == LEVEL_START:
+                level = varint()
+                elapsed += varint()
+                yield Record(LEVEL_START, elapsed, level=level)
+            elif tag == LEVEL_END:
+                outcome = data[position]
+                position += 1
+                elapsed += varint()
+                yield Record(LEVEL_END, elapsed, outcome=outcome)
+            else:
+                elapsed += varint()
+                yield Record(None, elapsed, move=(tag >> 4, tag & 0x0F))
+        except IndexError:
+            break
+    return started
+
+
+class LevelReplay:
+    """
+    What happened in one level of a session
+    """
+
+    def __init__(self, level, start_time):
+        self.level = level
+        self.start_time = start_time
+        self.end_time = start_time
+        self.moves = []  # (from, over, to) moves, with the time each was made
+        self.outcome = None  # None if the log ends in the middle of the level
+        self.error = None  # the first record that doesn't fit the rules, if any
+        self.position = None
+
+    def get_duration(self):
+        return self.end_time - self.start_time
+
+
+def replay_headless(records, levels):
+    """
+    Plays the records through the rules engine, as fast as possible
+    :param records: an iterable of records, as yielded by read_session
+    :param levels: the level pack the session was played with
+    Yields a LevelReplay for every level played
+    """
+    replay = None
+    for record in records:
+        if record.kind == LEVEL_START:
+            if replay is not None:
+                yield replay
+            replay = LevelReplay(record.level, record.time)
+            replay.position = levels.get_position(record.level) if 0 < record.level <= len(levels) else None
+            if replay.position is None:
+                replay.error = f'level {record.level} is not in the pack'
+        elif replay is None:
+            continue
+        elif record.kind == LEVEL_END:
+            replay.end_time = record.time
+            replay.outcome = record.outcome
+            expected = None if replay.position is None else \
+                WON if is_win(replay.position[0]) else STUCK if not has_moves(*replay.position) else LEFT
+            if replay.error is None and expected != record.outcome:
+                replay.error = f'the level ended as {OUTCOMES.get(record.outcome)}, but the position is {OUTCOMES.get(expected)}'
+            yield replay
+            replay = None
+        else:
+            replay.end_time = record.time
+            if replay.error is not None:
+                continue
+            move = find_move(*replay.position, *record.move)
+            if move is None:
+                replay.error = f'the move {record.move[0]}->{record.move[1]} is not legal'
+                continue
+            replay.position = apply_move(*replay.position, move)
+            replay.moves.append((move, record.time))
+    if replay is not None:
+        yield replay
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.replay', description='Replay a session log.')
+    parser.add_argument('session')
+    parser.add_argument('--visual', action='store_true', help='show the session on screen at real speed')
+    parser.add_argument('--pack', default=DEFAULT_PACK_PATH, help='the level pack the session was played with')
+    options = parser.parse_args(args)
+
+    if options.visual:
+        from .Black_sheep import BlackSheep
+        BlackSheep(pack_path=options.pack, replay=options.session)
+        return 0
+
+    start = time.perf_counter()
+    moves = 0
+    for replay in replay_headless(read_session(options.session), load_pack(options.pack)):
+        moves += len(replay.moves)
+        outcome = OUTCOMES.get(replay.outcome, 'unfinished')
+        line = ' '.join(f'{a}->{c}' for (a, b, c), _ in replay.moves)
+        print(f'level {replay.level}: {outcome} after {replay.get_duration() / 1000:.1f} s: {line}'
+              + (f' ({replay.error})' if replay.error else ''))
+    print(f'{moves} moves replayed in {(time.perf_counter() - start) * 1000:.2f} ms')
+    return 0
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Retrograde analysis of the whole position space.
+Every position is a 13 bit mask plus the black ball's hole (or none), packed by position_key into 2^13 * 14 states.
+build_table classifies all of them at once with NumPy passes over the jump table, from the positions with one ball up,
+and stores for each state its distance to a win in moves (LOSS if it can't be won, INVALID if it's not a position).
+The result is written to a small binary file, which the game maps to memory with OutcomeTable,
+so it can tell whether any position is still winnable in O(1) without searching.
+Usage: python -m modules.retrograde [path]
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from .rules import HOLES, JUMPS, position_key
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed to build the table, not to read it
+    np = None
+
+
+OUTCOMES_PATH = os.path.join(Path(__file__).parent.parent, 'assets', 'data', 'outcomes.bin')
+
+STATES = (1 << HOLES) * (HOLES + 1)
+LOSS = 255
+INVALID = 254
+
+_MAGIC = b'BSOT'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHI')  # magic, version, holes, states
+
+
+def build_table():
+    """
+    :return: a NumPy array of the distance to a win of every state, indexed by position_key
+    """
+    if np is None:
+        raise ImportError('building the outcomes table requires numpy')
+    keys = np.arange(STATES, dtype=np.int64)
+    masks = keys & ((1 << HOLES) - 1)
+    blacks = keys >> HOLES
+    valid = (blacks == HOLES) | ((masks >> np.minimum(blacks, HOLES - 1)) & 1).astype(bool)
+    balls = np.zeros(STATES, dtype=np.int64)
+    for number in range(HOLES):
+        balls += (masks >> number) & 1
+
+    distances = np.full(STATES, LOSS, dtype=np.int16)
+    distances[~valid] = INVALID
+    distances[valid & (balls == 1)] = 0
+
+    # every move removes a ball, so all the children of a layer are in the layers below it
+    for count in range(2, HOLES + 1):
+        layer = np.flatnonzero(valid & (balls == count))
+        mask, black = masks[layer], blacks[layer]
+        best = np.full(len(layer), LOSS, dtype=np.int16)
+        for a, b, c in JUMPS:
+            legal = ((mask >> a) & 1).astype(bool) & ((mask >> b) & 1).astype(bool) & ~((mask >> c) & 1).astype(bool)
+            legal &= black != b
+            child_mask = mask ^ ((1 << a) | (1 << b) | (1 << c))
+            child_black = np.where(black == a, c, black)
+            child = distances[child_mask | (child_black << HOLES)]
+            winning = legal & (child < INVALID)
+            best = np.where(winning, np.minimum(best, child + 1), best)
+        distances[layer] = best
+    return distances.astype(np.uint8)
+
+
+def write_table(distances, path=OUTCOMES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, HOLES, STATES))
+        file.write(bytes(distances))
+
+
+class OutcomeTable:
+    """
+    The outcomes file mapped to memory, looked up by position
+    """
+
+    def __init__(self, path=OUTCOMES_PATH):
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, holes, states = _HEADER.unpack_from(self.data)
+        if magic != _MAGIC or version != _VERSION or holes != HOLES or states != STATES:
+            self.data.close()
+            raise ValueError(f'{path} is not an outcomes table of this board')
+        if len(self.data) != _HEADER.size + STATES:
+            self.data.close()
+            raise ValueError(f'{path} is truncated')
+
+    @classmethod
+    def load(cls, path=OUTCOMES_PATH):
+        """
+        :return: the table, or None if there's no valid table at path
+        """
+        try:
+            return cls(path)
+        except (OSError, ValueError):
+            return None
+
+    def distance(self, mask, black):
+        """
+        :return: the number of moves to win the position, or None if it can't be won
+        """
+        distance = self.data[_HEADER.size + position_key(mask, black)]
+        return distance if distance < INVALID else None
+
+    def is_winnable(self, mask, black):
+        return self.distance(mask, black) is not None
+
+    def close(self):
+        self.data.close()
+
+
+def main(args):
+    path = args[0] if args else OUTCOMES_PATH
+    start = time.perf_counter()
+    distances = build_table()
+    write_table(distances, path)
+    winnable = int((distances < INVALID).sum())
+    lost = int((distances == LOSS).sum())
+    print(f'{winnable} winnable and {lost} lost positions written to {path} in {time.perf_counter() - start:.2f} s')
+
+
+if "__main__" == __name__:
+    main(sys.argv[1:])
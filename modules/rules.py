@@ -0,0 +1,36 @@
+"""
+Headless rules engine of the game.
+A position is a 13 bit occupancy mask (bit i is set if hole i holds a ball, white or black),
+plus the index of the hole holding the black ball (None if there's no black ball).
+A move is a (from, over, to) triple of hole numbers.
+The rules are those of the classic geometry, see modules.geometry for the rules of the other boards.
+"""
+from .geometry import CLASSIC
+
+
+HOLES = CLASSIC.holes
+
+# hole locations on the board in units of half the distance between two neighbouring holes
+HOLE_POINTS = CLASSIC.points
+
+FULL_MASK = CLASSIC.full_mask
+
+JUMPS = CLASSIC.jumps
+
+# the jumps starting at each hole, indexed by hole number
+JUMPS_FROM = CLASSIC.jumps_from
+
+# the jumps whose legality depends on each hole, indexed by hole number
+JUMPS_TOUCHING = CLASSIC.jumps_touching
+
+make_position = CLASSIC.make_position
+make_order = CLASSIC.make_order
+position_key = CLASSIC.position_key
+is_legal = CLASSIC.is_legal
+legal_moves = CLASSIC.legal_moves
+has_moves = CLASSIC.has_moves
+apply_move = CLASSIC.apply_move
+find_move = CLASSIC.find_move
+count_balls = CLASSIC.count_balls
+is_win = CLASSIC.is_win
+holes_of = CLASSIC.holes_of
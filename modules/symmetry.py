@@ -0,0 +1,48 @@
+"""
+Symmetries of the board.
+The holes are laid out on a square, so the board looks the same under its 4 rotations and 4 reflections.
+Each symmetry is a permutation of the hole numbers, derived in modules.geometry, and a position is canonicalized
+by taking the image with the smallest key under all of them, so equivalent positions share one canonical form.
+The positions are mapped by the classic geometry, see Geometry.transform and Geometry.canonical_key.
+"""
+from .orders import orders
+from .geometry import CLASSIC
+from .rules import make_position, position_key
+
+
+PERMUTATIONS = CLASSIC.permutations
+
+transform = CLASSIC.transform  # (mask, black, the index of the symmetry in PERMUTATIONS) -> the image (mask, black)
+
+
+def transform_move(move, symmetry):
+    permutation = PERMUTATIONS[symmetry]
+    return tuple(permutation[number] for number in move)
+
+
+def canonical_symmetry(mask, black):
+    """
+    :return: the index of the symmetry that maps the position to its canonical form
+    """
+    return min(range(len(PERMUTATIONS)), key=lambda symmetry: position_key(*transform(mask, black, symmetry)))
+
+
+def canonical(mask, black):
+    """
+    :return: the canonical (mask, black) of the position
+    """
+    return transform(mask, black, canonical_symmetry(mask, black))
+
+
+canonical_key = CLASSIC.canonical_key
+
+
+def find_duplicate_levels(levels=orders):
+    """
+    :param levels: a list of levels in the format of orders
+    :return: a list of groups of level numbers (starting from 1) that are the same puzzle rotated or mirrored
+    """
+    groups = {}
+    for number, order in enumerate(levels, start=1):
+        groups.setdefault(canonical_key(*make_position(order[:-1], order[-1])), []).append(number)
+    return [group for group in groups.values() if len(group) > 1]
@@ -0,0 +1,18 @@
+"""
+Printing of the reports of the command line tools as aligned text tables.
+"""
+import sys
+
+
+def print_table(rows, columns, file=sys.stdout):
+    """
+    :param rows: a list of dictionaries with the keys in columns
+    :param columns: the keys of the columns, in order, also printed as their titles
+    """
+    def cell(value):
+        return f'{value:.3f}' if isinstance(value, float) else str(value)
+
+    widths = [max(len(column), *(len(cell(row[column])) for row in rows)) for column in columns]
+    print('  '.join(column.rjust(width) for column, width in zip(columns, widths)), file=file)
+    for row in rows:
+        print('  '.join(cell(row[column]).rjust(width) for column, width in zip(columns, widths)), file=file)
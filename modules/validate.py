@@ -0,0 +1,112 @@
+"""
+Batch validator for the levels in orders.
+Checks every level for malformed entries and for being the same puzzle as an earlier level rotated or mirrored,
+solves all of them in parallel and prints a JSON report, exiting with status 1 if any level is malformed or can't be solved.
+Usage: python -m modules.validate [--workers N] [--indent N]
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .orders import orders
+from .rules import HOLES, make_position
+from .solver import Solver
+from .symmetry import find_duplicate_levels
+
+
+_solver = None  # one solver per worker process, so its table is shared by all the levels the worker solves
+
+
+def check_level(order):
+    """
+    :param order: a level as written in orders, the white balls followed by the black ball (None if there's none)
+    :return: a list of the problems found in the level
+    """
+    errors = []
+    if not order:
+        return ['the level is empty']
+    whites, black = order[:-1], order[-1]
+    if not all(isinstance(number, int) for number in whites) or not (black is None or isinstance(black, int)):
+        return ['the level contains a value that is not a hole number']
+    for number in whites:
+        if not 0 <= number < HOLES:
+            errors.append(f'white ball at hole {number}, which does not exist')
+    if black is not None and not 0 <= black < HOLES:
+        errors.append(f'black ball at hole {black}, which does not exist')
+    duplicates = sorted({number for number in whites if whites.count(number) > 1})
+    if duplicates:
+        errors.append(f'more than one white ball at holes {duplicates}')
+    if black in whites:
+        errors.append(f'black ball at hole {black}, which already holds a white ball')
+    if len(set(whites) | {black} - {None}) < 2:
+        errors.append('the level starts with less than two balls, so it is already solved')
+    return errors
+
+
+def solve_order(order):
+    global _solver
+    if _solver is None:
+        _solver = Solver()
+    mask, black = make_position(order[:-1], order[-1])
+    solution = _solver.solve(mask, black)
+    return solution.moves, solution.nodes, solution.seconds
+
+
+def validate_levels(levels, workers=None):
+    """
+    :param levels: a list of levels in the format of orders
+    :param workers: the number of worker processes, defaults to the number of processors
+    :return: the report as a dictionary
+    """
+    start = time.perf_counter()
+    checks = [check_level(order) for order in levels]
+    # only the well-formed levels are solved and compared, the others can't be turned into positions
+    well_formed = [number for number, errors in enumerate(checks) if not errors]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        solved = executor.map(solve_order, [levels[number] for number in well_formed],
+                              chunksize=max(1, len(well_formed) // 64))
+        solutions = dict(zip(well_formed, solved))
+
+    groups = find_duplicate_levels([levels[number] for number in well_formed])
+    duplicates = [[well_formed[number - 1] + 1 for number in group] for group in groups]
+    same_as = {number: group[0] for group in duplicates for number in group[1:]}
+
+    report = []
+    for number, (order, errors) in enumerate(zip(levels, checks), start=1):
+        moves, nodes, seconds = solutions.get(number - 1, (None, None, None))
+        if number in same_as:
+            errors.append(f'the same puzzle as level {same_as[number]}, rotated or mirrored')
+        if number - 1 in solutions and moves is None:
+            errors.append('the level can not be solved')
+        report.append({
+            'level': number,
+            'valid': not errors,
+            'errors': errors,
+            'solution': [[a, c] for a, b, c in moves] if moves is not None else None,
+            'nodes': nodes,
+            'seconds': seconds,
+        })
+    return {
+        'valid': all(level['valid'] for level in report),
+        'levels': report,
+        'invalid_levels': [level['level'] for level in report if not level['valid']],
+        'duplicates': duplicates,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m modules.validate', description='Validate the levels of the game.')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--indent', type=int, default=None, help='indent the JSON report')
+    options = parser.parse_args(args)
+
+    report = validate_levels([list(order) for order in orders], options.workers)
+    print(json.dumps(report, indent=options.indent))
+    return 0 if report['valid'] else 1
+
+
+if "__main__" == __name__:
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # the board is drawn without a window
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pygame
+import pytest
+
+
+@pytest.fixture(scope='session')
+def screen():
+    pygame.display.init()
+    pygame.font.init()
+    surface = pygame.display.set_mode((600, 600))
+    yield surface
+    pygame.quit()
@@ -0,0 +1,73 @@
+from modules.analytics import analyze, main, session_paths
+from modules.replay import STUCK, WON, SessionRecorder
+from modules.rules import apply_move, legal_moves, make_position
+from modules.orders import orders
+from modules.solver import Solver
+
+
+def fatal_move(level):
+    """
+    :return: the first legal move of the level after which it can't be won
+    """
+    solver = Solver()
+    order = orders[level - 1]
+    mask, black = make_position(order[:-1], order[-1])
+    return next(move for move in legal_moves(mask, black) if not solver.winnable(*apply_move(mask, black, move)))
+
+
+def record_sessions(directory):
+    """
+    Records four sessions, each in a directory of its own since a session log is named after the second it started in
+    """
+    solution = Solver().solve_level(1).moves
+    a, b, c = fatal_move(2)
+
+    first = SessionRecorder(directory / 'one')
+    first.start_level(1)
+    for move in solution:
+        first.record_move(move[0], move[2])
+    first.end_level(WON)
+    first.start_level(2)
+    first.record_move(a, c)
+    first.close()  # ends in the middle of level 2
+
+    second = SessionRecorder(directory / 'two' / 'nested')
+    second.start_level(2)
+    second.record_move(a, c)
+    second.end_level(STUCK)  # not what the position is, so the level is left out as a bad one
+    second.start_level(2)
+    second.close()
+
+    third = SessionRecorder(directory / 'three')
+    third.start_level(1)
+    third.start_level(3)  # leaves level 1
+    third.end_level(STUCK)
+    third.close()
+
+    fourth = SessionRecorder(directory / 'four')
+    fourth.start_level(1)
+    fourth.start_level(1)
+    fourth.start_level(5)
+    fourth.close()
+    return (a, c)
+
+
+def test_sessions_are_aggregated_per_level(tmp_path):
+    fatal = record_sessions(tmp_path)
+    assert len(list(session_paths(tmp_path))) == 4
+    assert list(session_paths(tmp_path / 'missing')) == []
+    total = analyze(session_paths(tmp_path), workers=2, shard=1)
+    assert (total.files, total.errors) == (4, 2)  # the stuck level 2 and level 3, which isn't stuck at its start
+
+    one, two = total.levels[1].to_row(1), total.levels[2].to_row(2)
+    assert (one['plays'], one['won'], one['left'], one['last_level_of']) == (4, 1, 3, 0)
+    assert (two['plays'], two['won'], two['left'], two['last_level_of']) == (2, 0, 2, 2)
+    assert two['fatal_moves'] == f'{fatal[0]}->{fatal[1]}:1'
+    assert set(total.levels) == {1, 2, 5}
+
+
+def test_most_quit_level_is_ranked_by_the_times_it_was_left(tmp_path, capsys):
+    record_sessions(tmp_path)
+    assert main([str(tmp_path), '--workers', '1']) == 0
+    # level 2 was left twice, both times as the last level of its session, which doesn't count twice
+    assert 'most quit level: 1, left 3 times' in capsys.readouterr().out
@@ -0,0 +1,40 @@
+import pygame
+
+from modules.Assets import AssetCache
+
+
+def make_image(path, size=(8, 8)):
+    surface = pygame.Surface(size)
+    surface.fill((200, 30, 30))
+    pygame.image.save(surface, str(path))
+    return str(path)
+
+
+def test_images_are_loaded_once(screen, tmp_path):
+    cache = AssetCache()
+    path = make_image(tmp_path / 'ball.png')
+    first = cache.get(path, (16, 16), (0, 0, 0))
+    assert cache.get(path, (16, 16), (0, 0, 0)) is first
+    assert first.get_size() == (16, 16) and first.get_colorkey()[:3] == (0, 0, 0)
+    assert (cache.hits, cache.misses) == (1, 2)  # the original image is loaded once, to be scaled
+    assert cache.bytes == sum(cache.size_of(surface) for surface in cache.surfaces.values())
+
+
+def test_least_recently_used_images_are_evicted(screen, tmp_path):
+    paths = [make_image(tmp_path / f'{name}.png', (32, 32)) for name in 'abcd']
+    cache = AssetCache()
+    one = cache.size_of(cache.get(paths[0]))
+    cache.clear()
+    assert cache.bytes == 0 and not cache.surfaces
+
+    cache.set_limit(one * 3)
+    for path in paths[:3]:
+        cache.get(path)
+    cache.get(paths[0])  # used again, so b is now the least recently used
+    cache.get(paths[3])
+    assert [key[0] for key in cache.surfaces] == [paths[2], paths[0], paths[3]]
+    assert cache.bytes == one * 3
+
+    cache.set_limit(1)  # the last image is kept even when it alone is bigger than the limit
+    assert [key[0] for key in cache.surfaces] == [paths[3]]
+    assert cache.bytes == one
@@ -0,0 +1,71 @@
+import random
+
+import pygame
+import pytest
+
+from modules.Board import Board
+from modules.Input import pointer
+from modules.colores import colores
+from modules.orders import orders
+
+
+def full_render(board):
+    """
+    :return: a copy of the screen with the whole board drawn on it
+    """
+    screen = board.screen
+    board.screen = screen.copy()
+    try:
+        board.show()
+        return board.screen
+    finally:
+        board.screen = screen
+
+
+def assert_same_pixels(first, second):
+    assert pygame.image.tobytes(first, 'RGB') == pygame.image.tobytes(second, 'RGB')
+
+
+@pytest.mark.parametrize('size', [600, 437])
+def test_touched_hole_matches_the_colliding_holes(screen, size):
+    board = Board(screen, (size, size))
+    rect = board.get_balls().sprites()[0].rect.copy()
+    for x in range(-10, screen.get_width() + 10):
+        for y in range(-10, screen.get_height() + 10, 3):
+            rect.center = (x, y)
+            holes = [hole for hole in board.get_holes() if hole.rect.colliderect(rect)]
+            assert board.get_touched_hole(rect) is (holes[0] if len(holes) == 1 else None), (x, y)
+
+
+@pytest.mark.parametrize('size', [600, 437])
+def test_ball_at_matches_the_ball_rects(screen, size):
+    board = Board(screen, (size, size))
+    for x in range(0, screen.get_width(), 2):
+        for y in range(0, screen.get_height(), 2):
+            ball = next((ball for ball in board.get_balls() if ball.rect.collidepoint((x, y))), None)
+            assert board.get_ball_at((x, y)) is ball, (x, y)
+
+
+@pytest.mark.parametrize('level', [1, 5, 20])
+def test_dirty_repaints_match_full_redraws(screen, level):
+    order = orders[level - 1]
+    board = Board(screen, (600, 600), white_order=order[:-1], black_ball_loc=order[-1], color=colores['BLACK1'])
+    board.invalidate()
+    rng = random.Random(level)
+    while board.get_moves():
+        board.show_dirty()
+        assert_same_pixels(screen, full_render(board))
+        # pick a ball up, drag it to its destination over a few frames and drop it, as the game loop does
+        a, b, c = rng.choice(sorted(board.get_moves()))
+        ball = board.get_hole(a).get_ball()
+        board.activate(ball)
+        (x1, y1), (x2, y2) = board.get_hole(a).get_center(), board.get_hole(c).get_center()
+        for step in range(1, 5):
+            ball.get_possible_destinations(highlight=True)
+            pointer.pos = (x1 + (x2 - x1) * step // 4, y1 + (y2 - y1) * step // 4)
+            ball.follow_mouse()
+            board.show_dirty()
+            assert_same_pixels(screen, full_render(board))
+        ball.release_at_hole(board.get_hole(c))
+    board.show_dirty()
+    assert_same_pixels(screen, full_render(board))
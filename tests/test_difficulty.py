@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from modules.difficulty import DifficultyAnalyzer, main
+from modules.generator import generate, read_levels
+from modules.orders import orders
+from modules.rules import apply_move, is_win, legal_moves, make_position
+
+
+def lines(mask, black, depth=0):
+    """
+    Yields (won, depth, branchings) for every series of moves from the position, without memoizing anything
+    """
+    moves = legal_moves(mask, black)
+    if not moves:
+        yield is_win(mask), depth, []
+        return
+    for move in moves:
+        for won, end, branchings in lines(*apply_move(mask, black, move), depth + 1):
+            yield won, end, [len(moves)] + branchings
+
+
+@pytest.mark.parametrize('level', [1, 2, 7, 13])
+def test_metrics_count_every_line(level):
+    order = orders[level - 1]
+    mask, black = make_position(order[:-1], order[-1])
+    row = DifficultyAnalyzer().analyze(level, mask, black)
+    every = list(lines(mask, black))
+    wins = [depth for won, depth, branchings in every if won]
+    assert row['lines'] == len(every)
+    assert row['winning_lines'] == len(wins)
+    assert row['min_depth'] == (min(wins) if wins else None)
+    assert row['max_branching'] == max(max(branchings, default=0) for won, depth, branchings in every)
+
+
+def test_generated_levels_are_read_back(tmp_path, capsys):
+    levels = list(generate(balls=6, seed=3, max_failures=50))[:20]
+    path = tmp_path / 'levels.jsonl'
+    path.write_text(''.join(json.dumps(level.to_dict()) + '\n\n' for level in levels))
+    assert list(read_levels(path)) == [level.order() for level in levels]
+
+    assert main(['--levels', str(path), '--csv']) == 0
+    rows = capsys.readouterr().out.splitlines()
+    assert rows[0].startswith('level,balls,black,') and len(rows) == 21
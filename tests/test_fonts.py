@@ -0,0 +1,27 @@
+import pytest
+
+from modules.Fonts import FontCache
+
+TEXT = 'The black sheep'
+
+
+@pytest.mark.parametrize('width', [1, 40, 100, 250, 10000])
+def test_fit_size_is_the_biggest_size_that_fits(screen, width):
+    cache = FontCache()
+    size = cache.fit_size('Arial', 60, TEXT, width)
+    assert 1 <= size <= 60
+    if size > 1:
+        assert cache.get_font('Arial', size).size(TEXT)[0] <= width
+    if size < 60:
+        assert cache.get_font('Arial', size + 1).size(TEXT)[0] > width
+
+
+def test_rendered_texts_are_shared_and_bounded(screen):
+    cache = FontCache(max_texts=2)
+    first = cache.render('Arial', 20, 'one', (0, 0, 0))
+    assert cache.render('Arial', 20, 'one', [0, 0, 0]) is first
+    assert cache.get_font('Arial', 20) is cache.get_font('Arial', 20)
+    cache.render('Arial', 20, 'two', (0, 0, 0))
+    cache.render('Arial', 20, 'one', (0, 0, 0))  # used again, so 'two' is the oldest
+    cache.render('Arial', 20, 'three', (0, 0, 0))
+    assert [key[2] for key in cache.texts] == ['one', 'three']
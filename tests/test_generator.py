@@ -0,0 +1,38 @@
+import pytest
+
+from modules.generator import generate, generate_pack
+from modules.rules import apply_move, count_balls, is_win, legal_moves
+from modules.symmetry import canonical_key
+
+
+def assert_solved_by_its_solution(level):
+    mask, black = level.mask, level.black
+    for move in level.solution:
+        assert move in legal_moves(mask, black)
+        mask, black = apply_move(mask, black, move)
+    assert is_win(mask)
+
+
+def test_generated_levels_are_new_and_solvable():
+    levels = list(generate(balls=7, black=True, seed=1, max_failures=200))
+    assert levels and len({canonical_key(level.mask, level.black) for level in levels}) == len(levels)
+    for level in levels:
+        assert count_balls(level.mask) == 7 and level.black is not None and level.difficulty >= 0
+        assert_solved_by_its_solution(level)
+
+
+def test_pack_has_as_many_levels_as_asked_for():
+    levels = list(generate_pack(2000, workers=4))
+    assert len(levels) == 2000
+    assert len({canonical_key(level.mask, level.black) for level in levels}) == 2000
+
+
+def test_pack_reports_a_shortfall():
+    levels = []
+    with pytest.raises(ValueError):
+        for level in generate_pack(100, workers=2, balls=12, black=False):
+            levels.append(level)
+    assert 0 < len(levels) < 100
+    assert len({canonical_key(level.mask, level.black) for level in levels}) == len(levels)
+    for level in levels:
+        assert_solved_by_its_solution(level)
@@ -0,0 +1,57 @@
+import pytest
+
+from modules.Board import Board
+from modules.geometry import ENGLISH, GEOMETRIES
+from modules.solver import Solver
+
+
+def assert_solution_wins(geometry, mask, black, solution):
+    assert solution.is_solvable()
+    for move in solution.moves:
+        assert move in geometry.legal_moves(mask, black)
+        mask, black = geometry.apply_move(mask, black, move)
+    assert geometry.is_win(mask)
+
+
+@pytest.mark.parametrize('name', GEOMETRIES)
+def test_symmetries_keep_the_jumps(name):
+    geometry = GEOMETRIES[name]
+    jumps = set(geometry.jumps)
+    assert geometry.permutations[0] == tuple(range(geometry.holes))
+    for permutation in geometry.permutations:
+        assert {tuple(permutation[number] for number in jump) for jump in jumps} == jumps
+
+
+@pytest.mark.parametrize('name', GEOMETRIES)
+def test_every_geometry_is_solved_from_the_middle(name):
+    geometry = GEOMETRIES[name]
+    mask = geometry.full_mask & ~(1 << geometry.get_center())
+    assert_solution_wins(geometry, mask, None, Solver(geometry=geometry).solve(mask, None))
+
+
+@pytest.mark.parametrize('hole', [0, 4, 28])
+@pytest.mark.parametrize('symmetric', [True, False])
+def test_english_board_is_solved_from_its_hard_starts(hole, symmetric):
+    # without the restarts these take from a hundred thousand to millions of nodes
+    mask = ENGLISH.full_mask & ~(1 << hole)
+    solution = Solver(symmetric=symmetric, geometry=ENGLISH).solve(mask, None)
+    assert_solution_wins(ENGLISH, mask, None, solution)
+    assert solution.nodes < 50000
+
+
+def test_lost_positions_are_searched_to_their_end():
+    mask = (1 << 0) | (1 << 2) | (1 << 30) | (1 << 32)  # four corners, no ball can move
+    assert not Solver(geometry=ENGLISH).solve(mask, None).is_solvable()
+    classic = GEOMETRIES['classic']
+    solver = Solver(geometry=classic)
+    for mask in range(1, 1 << classic.holes, 7):
+        solution = solver.solve(mask, None)
+        assert solution.is_solvable() == solver.winnable(mask, None) == Solver(symmetric=False, geometry=classic).winnable(mask, None)
+
+
+def test_hole_indexes_are_kept_per_geometry(screen):
+    Board(screen, (600, 600))
+    board = Board(screen, (600, 600), white_order=range(1, ENGLISH.holes), black_ball_loc=None, geometry=ENGLISH)
+    for ball in board.get_balls():
+        assert board.get_ball_at(ball.rect.center) is ball
+        assert board.get_touched_hole(ball.rect) is ball.get_hole()
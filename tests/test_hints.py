@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from modules.hints import HintOracle
+from modules.orders import orders
+from modules.retrograde import OutcomeTable
+from modules.rules import apply_move, legal_moves, make_position
+from modules.solver import Solver
+
+
+def play(oracle, level, seed):
+    """
+    Plays random moves of the level, checking the oracle's answers at every position
+    """
+    order = orders[level - 1]
+    mask, black = make_position(order[:-1], order[-1])
+    oracle.prepare(mask, black)
+    searched = len(oracle.solver.table) if oracle.solver is not None else None
+    reference = Solver()
+    rng = random.Random(seed)
+    while True:
+        winnable = oracle.is_winnable(mask, black)
+        assert winnable == reference.winnable(mask, black)
+        moves = legal_moves(mask, black)
+        move = oracle.winning_move(mask, black)
+        if move is None:
+            assert not winnable or not moves  # no move keeps it winnable, unless it's already won
+        else:
+            assert move in moves and reference.winnable(*apply_move(mask, black, move))
+        if not moves:
+            break
+        mask, black = apply_move(mask, black, rng.choice(moves))
+    if searched is not None:
+        assert len(oracle.solver.table) == searched  # every answer was looked up, none searched while playing
+
+
+@pytest.mark.parametrize('level', [1, 13, 30, 48])
+def test_hints_keep_the_level_winnable(level):
+    for seed in range(5):
+        play(HintOracle(), level, seed)
+
+
+def test_hints_from_the_outcomes_table():
+    outcomes = OutcomeTable.load()
+    if outcomes is None:
+        pytest.skip('no outcomes file')
+    try:
+        for level in (1, 13, 30, 48):
+            play(HintOracle(outcomes), level, 0)
+    finally:
+        outcomes.close()
@@ -0,0 +1,77 @@
+import json
+import random
+
+import pytest
+
+from modules.levelpack import DEFAULT_PACK_PATH, LevelPack, OrdersPack, load_pack, main, write_pack
+from modules.orders import orders
+from modules.rules import HOLES, make_order, make_position
+
+
+def random_positions(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        mask = rng.getrandbits(HOLES)
+        yield mask, rng.choice([None] + [number for number in range(HOLES) if mask >> number & 1])
+
+
+def test_make_order_is_the_inverse_of_make_position():
+    for mask, black in random_positions(200):
+        order = make_order(mask, black)
+        assert make_position(order[:-1], order[-1]) == (mask, black)
+
+
+def test_pack_round_trip(tmp_path):
+    path = tmp_path / 'levels.pack'
+    positions = [make_position(order[:-1], order[-1]) for order in orders] + list(random_positions(500))
+    assert write_pack(path, iter(positions)) == len(positions)
+    pack = LevelPack(path)
+    try:
+        assert len(pack) == len(positions)
+        assert [pack.get_position(level) for level in range(1, len(pack) + 1)] == positions
+        with pytest.raises(IndexError):
+            pack.get_position(len(pack) + 1)
+    finally:
+        pack.close()
+
+
+def test_shipped_pack_holds_the_levels_of_orders():
+    pack = LevelPack(DEFAULT_PACK_PATH)
+    levels = OrdersPack()
+    try:
+        assert len(pack) == len(levels)
+        for level in range(1, len(levels) + 1):
+            assert pack.get_position(level) == levels.get_position(level)
+            assert pack.get_order(level) == levels.get_order(level)
+    finally:
+        pack.close()
+
+
+def test_broken_packs_fall_back_to_orders(tmp_path):
+    path = tmp_path / 'levels.pack'
+    write_pack(path, random_positions(10))
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        LevelPack(path)
+    path.write_bytes(b'XXXX' + data[4:])
+    assert isinstance(load_pack(path), OrdersPack)
+    assert isinstance(load_pack(tmp_path / 'missing.pack'), OrdersPack)
+
+
+def test_malformed_levels_are_not_packed(tmp_path, capsys):
+    levels = tmp_path / 'levels.jsonl'
+    path = tmp_path / 'levels.pack'
+    levels.write_text(''.join(json.dumps({'order': order}) + '\n' for order in [[0, 1, 3, None], [0, 1, 20, 2]]))
+    assert main(['build', str(path), '--levels', str(levels)]) == 1
+    assert 'level 2: white ball at hole 20' in capsys.readouterr().err and not path.exists()
+
+    assert main(['build', str(path), '--levels', str(levels), '--force']) == 0
+    pack = LevelPack(path)
+    try:
+        assert [pack.get_order(level) for level in (1, 2)] == [[0, 1, 3, None], [0, 1, 2]]
+    finally:
+        pack.close()
+
+    levels.write_text(json.dumps({'order': [0, 'a', 2]}) + '\n')
+    assert main(['build', str(path), '--levels', str(levels), '--force']) == 1
@@ -0,0 +1,56 @@
+import threading
+
+from modules.Prefetch import LevelPrefetcher
+from modules.hints import HintOracle
+from modules.levelpack import OrdersPack
+
+
+class SlowHints:
+    """
+    Hints whose preparation of the first position waits until it's released
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def prepare(self, mask, black):
+        self.calls += 1
+        if self.calls == 1:
+            self.release.wait(5)
+
+
+def test_prefetched_board_is_the_level_with_its_hints(screen):
+    levels = OrdersPack()
+    hints = HintOracle()
+    prefetcher = LevelPrefetcher(levels, hints)
+    prefetcher.request(screen, 600, 2)
+    prefetcher.request(screen, 600, 2)  # already being built
+    board = prefetcher.take(screen, 600, 2)
+    assert board.get_position() == levels.get_position(2)
+    assert hints.solver.table  # prepared on the thread, so the game doesn't search
+    assert prefetcher.take(screen, 600, 2) is None  # a board is taken once
+
+
+def test_boards_not_asked_for_are_not_taken(screen):
+    prefetcher = LevelPrefetcher(OrdersPack(), HintOracle())
+    assert prefetcher.take(screen, 600, 1) is None
+    prefetcher.request(screen, 600, 3)
+    assert prefetcher.take(screen, 500, 3) is None  # another size
+    assert prefetcher.take(screen, 600, 4) is None
+    assert prefetcher.take(screen, 600, 3) is not None
+
+
+def test_a_board_no_longer_wanted_is_dropped(screen):
+    levels = OrdersPack()
+    hints = SlowHints()
+    prefetcher = LevelPrefetcher(levels, hints)
+    prefetcher.request(screen, 600, 5)
+    first = prefetcher.thread
+    prefetcher.request(screen, 600, 6)  # doesn't wait for level 5
+    assert first.is_alive()
+    board = prefetcher.take(screen, 600, 6)
+    assert board.get_position() == levels.get_position(6)
+    hints.release.set()
+    first.join()
+    assert prefetcher.board is None and prefetcher.key is None  # level 5's board wasn't kept
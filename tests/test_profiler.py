@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from modules.Profiler import PHASES, FrameProfiler
+
+
+def record(profiler, frames):
+    for _ in range(frames):
+        profiler.start_frame()
+        for phase in PHASES:
+            profiler.mark(phase)
+        profiler.end_frame()
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = FrameProfiler(size=4)
+    record(profiler, 3)
+    assert profiler.get_frames() == [] and profiler.percentile(0.5) == 0.0
+
+
+def test_ring_buffer_keeps_the_last_frames():
+    profiler = FrameProfiler(size=4)
+    profiler.toggle()
+    record(profiler, 3)
+    assert len(profiler.get_frames()) == 3
+    record(profiler, 7)
+    frames = profiler.get_frames()
+    assert (profiler.count, profiler.total, len(frames)) == (4, 10, 4)
+    for frame in frames:
+        assert len(frame) == len(PHASES) + 1 and sum(frame[:-1]) <= frame[-1]
+
+    # the oldest frames are overwritten in order, so the buffer holds the frames marked last
+    for number in range(6):
+        profiler.start_frame()
+        profiler.current[0] = number
+        profiler.end_frame()
+    assert [frame[0] for frame in profiler.get_frames()] == [2, 3, 4, 5]
+    assert profiler.percentile(0) <= profiler.percentile(0.5) <= profiler.percentile(1)
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.json'])
+def test_dump_writes_the_frames(tmp_path, suffix):
+    profiler = FrameProfiler(size=8)
+    profiler.toggle()
+    record(profiler, 5)
+    path = str(tmp_path / f'profile{suffix}')
+    profiler.dump(path)
+    text = open(path).read()
+    if suffix == '.json':
+        assert json.loads(text) == {'columns': list(PHASES) + ['frame'], 'frames': profiler.get_frames()}
+    else:
+        assert text.splitlines()[0] == ','.join(PHASES + ('frame',)) and len(text.splitlines()) == 6
@@ -0,0 +1,67 @@
+import pytest
+
+from modules.levelpack import OrdersPack
+from modules.replay import LEFT, LEVEL_END, LEVEL_START, STUCK, WON, SessionRecorder, read_session, replay_headless
+from modules.solver import Solver
+
+
+def read_all(path):
+    """
+    :return: the records of a session log, and the start time it returns
+    """
+    records = []
+    session = read_session(path)
+    while True:
+        try:
+            records.append(next(session))
+        except StopIteration as stop:
+            return records, stop.value
+
+
+def test_session_log_round_trip(tmp_path):
+    solution = Solver().solve_level(1).moves
+    recorder = SessionRecorder(tmp_path)
+    recorder.start_level(1)
+    for a, b, c in solution:
+        recorder.record_move(a, c)
+    recorder.end_level(WON)
+    recorder.start_level(300)  # more than a byte, so the level is written as a varint of two bytes
+    recorder.start_level(2)  # leaves level 300
+    recorder.record_move(*solution[0][::2])  # not a legal move of level 2
+    recorder.close()  # leaves level 2
+
+    [path] = tmp_path.iterdir()
+    records, started = read_all(path)
+    assert started > 0
+    assert [(record.kind, record.level, record.move, record.outcome) for record in records] == \
+        [(LEVEL_START, 1, None, None)] + [(None, None, (a, c), None) for a, b, c in solution] + [
+            (LEVEL_END, None, None, WON),
+            (LEVEL_START, 300, None, None), (LEVEL_END, None, None, LEFT),
+            (LEVEL_START, 2, None, None), (None, None, solution[0][::2], None), (LEVEL_END, None, None, LEFT),
+        ]
+    assert all(first.time <= second.time for first, second in zip(records, records[1:]))
+
+    replays = list(replay_headless(records, OrdersPack()))
+    assert [(replay.level, replay.outcome) for replay in replays] == [(1, WON), (300, LEFT), (2, LEFT)]
+    assert replays[0].error is None and [move for move, time in replays[0].moves] == solution
+    assert 'not in the pack' in replays[1].error
+    assert 'not legal' in replays[2].error
+
+
+def test_truncated_session_log_keeps_its_whole_records(tmp_path):
+    recorder = SessionRecorder(tmp_path)
+    recorder.start_level(1)
+    recorder.record_move(0, 2)
+    recorder.end_level(STUCK)
+    recorder.close()
+    [path] = tmp_path.iterdir()
+    path.write_bytes(path.read_bytes()[:-2])  # cuts the last record in the middle
+    records, started = read_all(path)
+    assert [record.kind for record in records] == [LEVEL_START, None]
+
+
+def test_session_log_of_another_format_is_rejected(tmp_path):
+    path = tmp_path / 'session.bsr'
+    path.write_bytes(b'XXXX' + bytes(9))
+    with pytest.raises(ValueError):
+        read_all(path)
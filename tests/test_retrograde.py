@@ -0,0 +1,55 @@
+import pytest
+
+from modules.retrograde import OUTCOMES_PATH, OutcomeTable, build_table, write_table
+from modules.rules import HOLES, apply_move, is_win, legal_moves
+from modules.solver import Solver
+
+
+def positions():
+    for mask in range(1, 1 << HOLES):
+        yield mask, None
+        for black in range(HOLES):
+            if mask >> black & 1:
+                yield mask, black
+
+
+@pytest.fixture(scope='module')
+def outcomes(tmp_path_factory):
+    pytest.importorskip('numpy')  # to build the table
+    path = tmp_path_factory.mktemp('outcomes') / 'outcomes.bin'
+    write_table(build_table(), path)
+    table = OutcomeTable(path)
+    yield table
+    table.close()
+
+
+def test_outcomes_agree_with_the_solver(outcomes):
+    solver = Solver(symmetric=False)
+    for mask, black in positions():
+        assert outcomes.is_winnable(mask, black) == solver.winnable(mask, black), (mask, black)
+
+
+def test_outcome_distances_count_the_moves_to_a_win(outcomes):
+    for mask, black in positions():
+        distance = outcomes.distance(mask, black)
+        if distance is None or is_win(mask):
+            assert distance in (None, 0) and (distance == 0) == is_win(mask)
+            continue
+        children = [outcomes.distance(*apply_move(mask, black, move)) for move in legal_moves(mask, black)]
+        assert distance == 1 + min(child for child in children if child is not None)
+
+
+def test_shipped_outcomes_file_is_up_to_date(outcomes):
+    shipped = OutcomeTable.load(OUTCOMES_PATH)
+    if shipped is None:
+        pytest.skip('no outcomes file, the game searches instead')
+    try:
+        assert shipped.data[:] == outcomes.data[:]
+    finally:
+        shipped.close()
+
+
+def test_truncated_outcomes_file_is_not_loaded(outcomes, tmp_path):
+    path = tmp_path / 'outcomes.bin'
+    path.write_bytes(outcomes.data[:-1])
+    assert OutcomeTable.load(path) is None
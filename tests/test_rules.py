@@ -0,0 +1,46 @@
+import random
+from itertools import permutations
+
+import pytest
+
+from modules.Board import Board
+from modules.colores import colores
+from modules.geometry import CLASSIC
+from modules.rules import JUMPS, legal_moves
+
+
+def one_line(a, b, c):
+    """
+    The filter the board used to find the triples of holes, before the jump table
+    """
+    return a.rect.x - b.rect.x == b.rect.x - c.rect.x and a.rect.y - b.rect.y == b.rect.y - c.rect.y and \
+        [a.get_number(), b.get_number(), c.get_number()] not in [[0, 6, 12], [2, 6, 10], [12, 6, 0], [10, 6, 2]]
+
+
+def test_jump_table_matches_the_permutation_filter(screen):
+    board = Board(screen, (600, 600))
+    triples = {tuple(hole.get_number() for hole in triple) for triple in permutations(board.get_holes(), 3) if one_line(*triple)}
+    assert triples == set(JUMPS)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_board_moves_follow_legal_moves(screen, seed):
+    rng = random.Random(seed)
+    whites = rng.sample(range(CLASSIC.holes), rng.randint(4, CLASSIC.holes - 1))
+    black = rng.choice([None] + [number for number in range(CLASSIC.holes) if number not in whites])
+    board = Board(screen, (600, 600), white_order=whites, black_ball_loc=black, color=colores['BLACK1'])
+    while True:  # random moves, made the way the game makes them, until there are none left
+        mask, black = board.get_position()
+        assert board.get_moves() == set(legal_moves(mask, black))
+        for ball in board.get_balls():
+            start = ball.get_hole().get_number()
+            assert {hole.get_number() for hole in ball.get_possible_destinations()} == \
+                {c for a, b, c in legal_moves(mask, black) if a == start}
+        if not board.get_moves():
+            break
+        a, b, c = rng.choice(sorted(board.get_moves()))
+        ball = board.get_hole(a).get_ball()
+        board.activate(ball)
+        ball.start_moving()
+        ball.release_at_hole(board.get_hole(c))
+    assert board.no_possible_movement_left()
@@ -0,0 +1,37 @@
+import inspect
+
+from modules.Scenes import SceneManager
+
+
+def test_scenes_run_one_after_the_other():
+    scenes = SceneManager()
+    calls = []
+
+    def menu(visits):
+        calls.append(('menu', visits, scenes.get_current_scene()[1]))
+        if visits < 3:
+            scenes.switch(game, visits + 1, 'level')
+
+    def game(visits, name):
+        calls.append(('game', visits, name))
+        assert scenes.is_switching() is False
+        scenes.switch(menu, visits)
+        assert scenes.is_switching()
+
+    scenes.run(menu, 0)
+    assert calls == [('menu', 0, (0,)), ('game', 1, 'level'), ('menu', 1, (1,)), ('game', 2, 'level'),
+                     ('menu', 2, (2,)), ('game', 3, 'level'), ('menu', 3, (3,))]
+    assert not scenes.is_switching()
+
+
+def test_scenes_do_not_nest():
+    scenes = SceneManager()
+    depths = []
+
+    def page(count):
+        depths.append(len(inspect.stack()))
+        if count:
+            scenes.switch(page, count - 1)
+
+    scenes.run(page, 50)
+    assert len(set(depths)) == 1  # every page starts from the manager's loop, not from the page before it
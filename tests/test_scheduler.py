@@ -0,0 +1,44 @@
+import time
+
+import pygame
+
+from modules.Scheduler import FrameScheduler
+
+
+class Clock:
+
+    def __init__(self):
+        self.ticks = []
+
+    def tick(self, fps=0):
+        self.ticks.append(fps)
+
+
+def test_the_scheduler_idles_until_input(screen):
+    pygame.event.clear()
+    clock = Clock()
+    scheduler = FrameScheduler(clock, grace=50, idle_timeout=20)
+    scheduler.enter(30)
+    assert not scheduler.is_idle()
+    scheduler.tick()
+    time.sleep(0.06)
+    assert scheduler.is_idle()
+    scheduler.tick()
+    assert clock.ticks == [30, 0]  # full rate while awake, no frame rate cap once idle
+
+    start = time.monotonic()
+    assert scheduler.get_events() == []  # waits for input up to idle_timeout
+    assert time.monotonic() - start >= 0.015 and scheduler.is_idle()
+
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    assert [event.type for event in scheduler.get_events()] == [pygame.USEREVENT]
+    assert not scheduler.is_idle()  # input wakes the scene up
+
+
+def test_activity_keeps_the_scheduler_awake(screen):
+    clock = Clock()
+    scheduler = FrameScheduler(clock, fps=60, grace=20)
+    for _ in range(5):
+        time.sleep(0.01)
+        scheduler.tick(active=True)
+    assert clock.ticks == [60] * 5
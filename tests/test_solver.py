@@ -0,0 +1,14 @@
+from modules.orders import orders
+from modules.rules import apply_move, is_win, legal_moves, make_position
+from modules.solver import Solver
+
+
+def test_solutions_are_legal_and_win():
+    for solution in Solver().solve_all():
+        if solution.is_solvable():
+            order = orders[solution.level - 1]
+            mask, black = make_position(order[:-1], order[-1])
+            for move in solution.moves:
+                assert move in legal_moves(mask, black)
+                mask, black = apply_move(mask, black, move)
+            assert is_win(mask)
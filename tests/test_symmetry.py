@@ -0,0 +1,36 @@
+import random
+
+from modules.rules import HOLES, apply_move, legal_moves, make_order, position_key
+from modules.symmetry import PERMUTATIONS, canonical, canonical_key, find_duplicate_levels, transform, transform_move
+
+
+def random_positions(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        mask = rng.getrandbits(HOLES)
+        yield mask, rng.choice([None] + [number for number in range(HOLES) if mask >> number & 1])
+
+
+def test_canonical_key_is_the_same_for_every_symmetry():
+    for mask, black in random_positions(200):
+        keys = {canonical_key(*transform(mask, black, symmetry)) for symmetry in range(len(PERMUTATIONS))}
+        assert keys == {canonical_key(mask, black)} == {position_key(*canonical(mask, black))}
+
+
+def test_symmetries_map_moves_to_moves():
+    for mask, black in random_positions(200, seed=1):
+        for symmetry in range(len(PERMUTATIONS)):
+            image = transform(mask, black, symmetry)
+            moves = legal_moves(mask, black)
+            assert {transform_move(move, symmetry) for move in moves} == set(legal_moves(*image))
+            for move in moves:
+                assert transform(*apply_move(mask, black, move), symmetry) == \
+                    apply_move(*image, transform_move(move, symmetry))
+
+
+def test_rotated_levels_are_duplicates():
+    levels = [make_order(mask, black) for mask, black in random_positions(20, seed=2)]
+    rotated = [make_order(*transform(mask, black, 3)) for mask, black in random_positions(20, seed=2)]
+    group_of = {number: tuple(group) for group in find_duplicate_levels(levels + rotated) for number in group}
+    for number in range(1, 21):
+        assert group_of[number] == group_of[number + 20]
@@ -0,0 +1,20 @@
+from modules.validate import check_level, validate_levels
+
+
+def test_validator_reports_malformed_levels():
+    report = validate_levels([[], [1, 'a', 3], [1.5, 2, 3], [20, 1, 2], [0, 1, 2, 7], [0, 1, 2, 7]], workers=1)
+    assert [level['errors'] for level in report['levels'][:4]] == [
+        ['the level is empty'],
+        ['the level contains a value that is not a hole number'],
+        ['the level contains a value that is not a hole number'],
+        ['white ball at hole 20, which does not exist'],
+    ]
+    assert report['duplicates'] == [[5, 6]]
+    assert not report['valid']
+
+
+def test_checked_levels_keep_their_balls():
+    assert check_level([0, 0, 2, None]) == ['more than one white ball at holes [0]']
+    assert check_level([0, 2, 2]) == ['black ball at hole 2, which already holds a white ball']
+    assert check_level([4, None]) == ['the level starts with less than two balls, so it is already solved']
+    assert check_level([0, 1, 3, 6, 7]) == []